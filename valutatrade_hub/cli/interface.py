@@ -1,8 +1,12 @@
 # valutatrade_hub/cli/interface.py
+import heapq
 import os
 import sys
+import traceback
+from functools import cached_property, lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..core.currencies import get_currency
+from ..core.currencies import Currency, CurrencyRegistry, get_currency
 from ..core.exceptions import (
     ApiRequestError,
     AuthenticationError,
@@ -14,27 +18,99 @@ from ..core.exceptions import (
 )
 from ..infra.database import db
 
+USD = sys.intern('USD')
+
+
+def _canon(code: Optional[str]) -> str:
+    """Канонический код валюты из ввода: strip + upper, интернированная строка; пустой ввод → USD."""
+    if not code:
+        return USD
+    return sys.intern(code.strip().upper() or USD)
+
+
+# Форматы вывода баланса по коду валюты (криптовалюты — больше знаков после запятой)
+_BALANCE_FMT: Dict[str, str] = {'BTC': '{:.4f}', 'ETH': '{:.4f}'}
+_DEFAULT_BALANCE_FMT = '{:.2f}'
+_PRECISE_BALANCE_FMT: Dict[str, str] = {'BTC': '{:.8f}', 'ETH': '{:.8f}'}
+_DEFAULT_PRECISE_BALANCE_FMT = '{:.4f}'
+
+
+@lru_cache(maxsize=256)
+def _cached_currency(code: str, registry_version: int) -> Currency:
+    """Мемоизированный get_currency; версия реестра в ключе сбрасывает кеш при регистрации валют."""
+    return get_currency(code)
+
+
+def _validate_currency(code: str) -> Currency:
+    """Проверка кода валюты для CLI. Неизвестный код — CurrencyNotFoundError (ошибки не кешируются)."""
+    return _cached_currency(code, CurrencyRegistry.get_version())
+
+
+# Строка кеша курсов: (pair, from_currency, to_currency, rate, updated_at, source)
+RateRow = Tuple[str, str, str, float, Optional[str], str]
+
+
+def _normalize_pairs(rates_data: Dict[str, Any], timestamp: Optional[str]) -> List[RateRow]:
+    """
+    Приводит кеш курсов к плоскому списку (pair, from, to, rate, updated_at, source) за один проход.
+    Поддерживает legacy-формат (rates + timestamp) и значения-числа вместо словарей; пары без '_' пропускаются.
+    """
+    pairs = rates_data.get('pairs') or rates_data.get('rates') or {}
+    rows: List[RateRow] = []
+    for pair, info in pairs.items():
+        if '_' not in pair:
+            continue
+        from_c, to_c = pair.split('_', 1)
+        if isinstance(info, dict):
+            rows.append((
+                pair, from_c, to_c, float(info.get('rate') or 0),
+                info.get('updated_at') or timestamp, info.get('source', ''),
+            ))
+        else:
+            rows.append((pair, from_c, to_c, float(info or 0), timestamp, ''))
+    return rows
+
+# Выбор источника в update-rates: пункт меню → имя клиента RatesUpdater (None — все источники)
+_UPDATE_SOURCE_MAP: Dict[str, Optional[str]] = {'1': None, '2': 'coingecko', '3': 'exchangerate'}
+
+# Десятичная запятая (ввод «1,5») → точка
+_COMMA_TO_DOT = str.maketrans({',': '.'})
+
+# Шаблоны строк show_rates: связанные методы format, без промежуточных f-строк на строку
+_RATE_LINE_BIG = '- {}_{}: {:,.2f}'.format
+_RATE_LINE_SMALL = '- {}_{}: {:.6f}'.format
+
+
+def _print_traceback() -> None:
+    """Traceback в stderr после сброса буферизованного stdout — сообщение об ошибке выводится раньше трассировки."""
+    sys.stdout.flush()
+    traceback.print_exc()
+
+
+def _read_line(prompt: str) -> str:
+    """Вывод подсказки и чтение строки напрямую из stdin (без readline-хуков input()). EOF → EOFError."""
+    out = sys.stdout
+    out.write(prompt)
+    out.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.strip()
+
 
 class InteractiveCLI:
     def __init__(self):
-        from ..core.currencies import CurrencyRegistry, initialize_currencies
-        from ..core.usecases import PortfolioManager, RateManager, UserManager
-        from ..logging_config import setup_logging
-        from ..parser_service.config import ParserConfig
-        from ..parser_service.scheduler import Scheduler
-        from ..parser_service.updater import RatesUpdater
-        
-        self.parser_config = ParserConfig.from_env()
-        self.rates_updater = RatesUpdater(self.parser_config)
-        self.scheduler = Scheduler(self.parser_config)
+        from ..core.currencies import initialize_currencies
 
-        setup_logging()
+        self._logging_configured = False
+        if os.name == 'nt':
+            os.system('')  # включает обработку ANSI-последовательностей в cmd.exe
         initialize_currencies()
         
-        self.user_manager = UserManager()
-        self.portfolio_manager = PortfolioManager()
-        self.rate_manager = RateManager()
         self.currency_registry = CurrencyRegistry
+        self._currency_codes_str = ''
+        self._currency_codes_version = -1
+        self._rates_cache = None
         
         self.menu_options = {
             'register': ('Register', self.register),
@@ -85,10 +161,122 @@ class InteractiveCLI:
             'quit': 'Так же выйти из программы'
         }
 
+        # Меню статично — собираем текст один раз
+        bar = '-' * 50
+        menu_lines = ['\n' + bar, '          VALUTATRADE HUB - главное меню', bar]
+        menu_lines.extend(
+            f'{digit:2} -> {command} - {self.menu_options_desc[command]}'
+            for digit, command in self.digit_mapping.items()
+        )
+        menu_lines.append(bar)
+        self._main_menu_text = '\n'.join(menu_lines)
+
+        # Индекс команд: цифры, полные имена и однозначные префиксы (от 2 символов) → команда
+        prefix_matches: Dict[str, set] = {}
+        for command in self.menu_options:
+            for i in range(2, len(command) + 1):
+                prefix_matches.setdefault(command[:i], set()).add(command)
+        self._prefix_index: Dict[str, Optional[str]] = {
+            prefix: next(iter(cmds)) if len(cmds) == 1 else None
+            for prefix, cmds in prefix_matches.items()
+        }
+        self._prefix_index.update({command: command for command in self.menu_options})
+        self._prefix_index.update(self.digit_mapping)
+
+    def _ensure_logging(self) -> None:
+        '''Однократная настройка логирования — при первом обращении к компонентам, которые пишут логи.'''
+        if self._logging_configured:
+            return
+        from ..logging_config import setup_logging
+        setup_logging()
+        self._logging_configured = True
+
+    # Сервисы создаются лениво: импорт parser_service (requests) и настройка логов — только при первом использовании
+    @cached_property
+    def user_manager(self):
+        from ..core.usecases import UserManager
+        self._ensure_logging()
+        return UserManager()
+
+    @cached_property
+    def portfolio_manager(self):
+        from ..core.usecases import PortfolioManager
+        self._ensure_logging()
+        return PortfolioManager()
+
+    @cached_property
+    def rate_manager(self):
+        from ..core.usecases import RateManager
+        return RateManager()
+
+    @cached_property
+    def _cached_rate(self):
+        '''LRU-кеш RateManager.get_rate по ключу (from, to, отметка rates.json).'''
+        @lru_cache(maxsize=128)
+        def cached(from_currency: str, to_currency: str, stamp: Tuple[int, int]) -> Tuple[float, Optional[str]]:
+            return self.rate_manager.get_rate(from_currency, to_currency)
+        return cached
+
+    def _get_rate(self, from_currency: str, to_currency: str) -> Tuple[float, Optional[str]]:
+        '''
+        Курс через LRU-кеш: повторный запрос той же пары — без чтения rates.json.
+        Кеш инвалидируется сменой mtime/размера файла; без файла — прямой вызов get_rate.
+        '''
+        stamp = db.file_stamp(db.path_for('rates'))
+        if stamp is None:
+            return self.rate_manager.get_rate(from_currency, to_currency)
+        return self._cached_rate(from_currency, to_currency, stamp)
+
+    def _rate_or_none(self, from_currency: str, to_currency: str) -> Optional[float]:
+        '''Курс для оценки портфеля: None, если пары нет в кеше или курс недоступен.'''
+        try:
+            return self._get_rate(from_currency, to_currency)[0]
+        except (CurrencyNotFoundError, ApiRequestError, ValueError, KeyError, TypeError):
+            # Неизвестная пара или повреждённая запись кеша
+            return None
+
+    @cached_property
+    def parser_config(self):
+        from ..parser_service.config import get_default_config
+        return get_default_config()
+
+    @cached_property
+    def rates_updater(self):
+        from ..parser_service.updater import RatesUpdater
+        self._ensure_logging()
+        return RatesUpdater(self.parser_config)
+
+    @cached_property
+    def scheduler(self):
+        from ..parser_service.scheduler import Scheduler
+        self._ensure_logging()
+        return Scheduler(self.parser_config)
+
+    def _load_rates_cache(self) -> Tuple[List[RateRow], Optional[str]]:
+        '''
+        Кеш data/rates.json: (строки _normalize_pairs, last_refresh).
+        Файл перечитывается и нормализуется только при смене mtime/размера.
+        '''
+        stamp = db.file_stamp(db.path_for('rates'))
+        if stamp is not None and self._rates_cache is not None and self._rates_cache[0] == stamp:
+            return self._rates_cache[1]
+
+        rates_data = db.load_data('rates') or {}
+        timestamp = rates_data.get('last_refresh') or rates_data.get('timestamp')
+        parsed = (_normalize_pairs(rates_data, timestamp), timestamp)
+        self._rates_cache = (stamp, parsed) if stamp is not None else None
+        return parsed
+
     def _currency_not_found_hint(self) -> str:
-        '''Подсказка при CurrencyNotFoundError: get-rate или список кодов.'''
-        codes = ', '.join(sorted(self.currency_registry.get_all_currencies().keys()))
-        return f'Используйте get-rate для списка курсов. Поддерживаемые коды: {codes}'
+        '''
+        Подсказка при CurrencyNotFoundError: get-rate или список кодов.
+        Строка кодов кешируется и пересобирается только при изменении реестра.
+        '''
+        version = self.currency_registry.get_version()
+        if version != self._currency_codes_version:
+            self._currency_codes_str = ', '.join(sorted(self.currency_registry.get_all_currencies().keys()))
+            self._currency_codes_version = version
+        return f'Используйте get-rate для списка курсов. Поддерживаемые коды: {self._currency_codes_str}'
 
     def _api_error_hint(self) -> str:
         '''Подсказка при ApiRequestError.'''
@@ -109,8 +297,7 @@ class InteractiveCLI:
         print('  3. Только ExchangeRate-API (exchangerate)')
         print()
         choice = input('Ваш выбор (1-3, Enter = все): ').strip() or '1'
-        source_map = {'1': None, '2': 'coingecko', '3': 'exchangerate'}
-        source = source_map.get(choice)
+        source = _UPDATE_SOURCE_MAP.get(choice)
         if source is None and choice != '1':
             print('Ошибка: Неверный выбор. Используется все источники.')
             source = None
@@ -119,6 +306,8 @@ class InteractiveCLI:
             print()
             print('INFO: Starting rates update...')
             rates, failed_sources = self.rates_updater.run_update(source)
+            if rates:
+                self._cached_rate.cache_clear()
             status = self.rates_updater.get_update_status()
             last_refresh = status.get('last_refresh') or '—'
 
@@ -155,15 +344,10 @@ class InteractiveCLI:
             print(f'Количество пар: {status['total_pairs']}')
             print(f'Источник: {status['source']}')
             
-            rates_data = db.load_data('rates') or {}
-            pairs = rates_data.get('pairs', {})
-            if not pairs and rates_data.get('rates'):
-                pairs = {k: {'rate': v} for k, v in rates_data['rates'].items()}
-            pair_list = list(pairs.keys())[:5]
+            rows, _ = self._load_rates_cache()
             print('\nПримеры текущих курсов:')
-            for pair in pair_list:
-                rate_val = pairs[pair].get('rate', pairs[pair]) if isinstance(pairs[pair], dict) else pairs[pair]
-                print(f'   {pair}: {float(rate_val):.6f}')
+            for pair, _, _, rate_val, _, _ in rows[:5]:
+                print(f'   {pair}: {rate_val:.6f}')
             
         except Exception as e:
             print(f'Ошибка: Произошла ошибка: {e}')
@@ -206,9 +390,9 @@ class InteractiveCLI:
     
     def clear_screen(self):
         '''
-        Очистка экрана
+        Очистка экрана ANSI-последовательностью (без запуска shell)
         '''
-        os.system('cls' if os.name == 'nt' else 'clear')
+        sys.stdout.write('\x1b[2J\x1b[H')
     
     def print_header(self, title: str):
         '''
@@ -234,7 +418,7 @@ class InteractiveCLI:
         Получение ввода от пользователя
         '''
         while True:
-            value = input(prompt).strip()
+            value = _read_line(prompt)
             if not value and required:
                 print('Ошибка: Это поле обязательно для заполнения!')
                 continue
@@ -245,8 +429,9 @@ class InteractiveCLI:
         Получение числового ввода
         '''
         while True:
+            line = _read_line(prompt)
             try:
-                value = float(input(prompt))
+                value = float(line.translate(_COMMA_TO_DOT))
                 if value <= 0:
                     print('Ошибка: Значение должно быть положительным!')
                     continue
@@ -258,15 +443,8 @@ class InteractiveCLI:
         '''
         Отображение главного меню с поддержкой цифр и слов
         '''
-        print('\n' + '-'*50)
-        print('          VALUTATRADE HUB - главное меню')
-        print('-'*50)
-        
-        for digit, command in self.digit_mapping.items():
-            print(f'{digit:2} -> {command} - {self.menu_options_desc[command]}')
-        
-        print('-'*50)
-        
+        print(self._main_menu_text)
+
     
     def register(self):
         '''
@@ -328,10 +506,10 @@ class InteractiveCLI:
         self.print_header('Процедура: Ваш портфель')
 
         base_input = input('Базовая валюта (Enter = USD): ').strip()
-        base_currency = (base_input or 'USD').upper()
+        base_currency = _canon(base_input)
 
         try:
-            get_currency(base_currency)
+            _validate_currency(base_currency)
         except CurrencyNotFoundError as e:
             print(f'\n{e}')
             print(self._currency_not_found_hint())
@@ -350,29 +528,27 @@ class InteractiveCLI:
 
             total_value = portfolio.get_total_value(
                 base_currency,
-                get_rate=lambda c, b: self.rate_manager.get_rate(c, b)[0],
+                get_rate=self._rate_or_none,
             )
 
             username = self.user_manager.current_user.username
-            print(f"\nПортфель пользователя '{username}' (база: {base_currency}):")
+            out = [f"\nПортфель пользователя '{username}' (база: {base_currency}):"]
 
             for currency_code, wallet in portfolio.wallets.items():
                 if currency_code == base_currency:
                     value = wallet.balance
                 else:
-                    try:
-                        rate = self.rate_manager.get_rate(currency_code, base_currency)[0]
-                        value = wallet.balance * rate
-                    except Exception:
-                        value = 0.0
+                    rate = self._rate_or_none(currency_code, base_currency)
+                    value = wallet.balance * rate if rate is not None else 0.0
 
-                balance_fmt = f'{wallet.balance:.4f}' if currency_code in ('BTC', 'ETH') else f'{wallet.balance:.2f}'
+                balance_fmt = _BALANCE_FMT.get(currency_code, _DEFAULT_BALANCE_FMT).format(wallet.balance)
                 value_fmt = f'{value:,.2f}' if value >= 1000 else f'{value:.2f}'
-                print(f"- {currency_code}: {balance_fmt}  → {value_fmt} {base_currency}")
+                out.append(f"- {currency_code}: {balance_fmt}  → {value_fmt} {base_currency}")
 
-            print("---------------------------------")
+            out.append("---------------------------------")
             total_fmt = f'{total_value:,.2f}' if total_value >= 1000 else f'{total_value:.2f}'
-            print(f"ИТОГО: {total_fmt} {base_currency}")
+            out.append(f"ИТОГО: {total_fmt} {base_currency}")
+            sys.stdout.write('\n'.join(out) + '\n')
 
         except Exception as e:
             print(f'\nОшибка: Произошла ошибка: {e}')
@@ -392,7 +568,7 @@ class InteractiveCLI:
         self.print_header('Процедура: Покупка валюты')
         
         try:
-            currency_code = self.get_user_input('Код валюты (например, BTC, EUR): ').upper()
+            currency_code = _canon(self.get_user_input('Код валюты (например, BTC, EUR): '))
             amount = self.get_float_input('Количество для покупки: ')
             
             if currency_code == 'USD':
@@ -414,7 +590,7 @@ class InteractiveCLI:
                     age = self.rate_manager.get_rates_age()
                     print(f'\n⚠ Данные курсов могут быть устаревшими ({age}).')
                     print('  Для актуальных курсов выполните команду update-rates.\n')
-                rate = self.rate_manager.get_rate(currency_code, 'USD')[0]
+                rate = self._get_rate(currency_code, 'USD')[0]
             except CurrencyNotFoundError as e:
                 print(f'\n{e}')
                 print(self._currency_not_found_hint())
@@ -456,11 +632,12 @@ class InteractiveCLI:
                     cost = result['cost']
                     old_bal = result['old_balance']
                     new_bal = result['new_balance']
-                    amount_fmt = f'{amount:.4f}' if currency_code in ('BTC', 'ETH') else f'{amount:.2f}'
+                    bal_fmt = _BALANCE_FMT.get(currency_code, _DEFAULT_BALANCE_FMT)
+                    amount_fmt = bal_fmt.format(amount)
                     rate_fmt = f'{rate:,.2f}' if rate >= 1000 else f'{rate:.2f}'
                     cost_fmt = f'{cost:,.2f}' if cost >= 1000 else f'{cost:.2f}'
-                    old_fmt = f'{old_bal:.4f}' if currency_code in ('BTC', 'ETH') else f'{old_bal:.2f}'
-                    new_fmt = f'{new_bal:.4f}' if currency_code in ('BTC', 'ETH') else f'{new_bal:.2f}'
+                    old_fmt = bal_fmt.format(old_bal)
+                    new_fmt = bal_fmt.format(new_bal)
                     print(f'\nПокупка выполнена: {amount_fmt} {currency_code} по курсу {rate_fmt} USD/{currency_code}')
                     print('Изменения в портфеле:')
                     print(f'- {currency_code}: было {old_fmt} → стало {new_fmt}')
@@ -474,15 +651,13 @@ class InteractiveCLI:
                     print(f'\n{e}')
                 except Exception as e:
                     print(f'\nОшибка: Ошибка при выполнении операции: {repr(e)}')
-                    import traceback
-                    traceback.print_exc()
+                    _print_traceback()
             else:
                 print('\nПокупка отменена.')
         
         except Exception as e:
             print(f'\nОшибка: Общая ошибка: {repr(e)}')
-            import traceback
-            traceback.print_exc()
+            _print_traceback()
         
         self.wait_for_enter()
     
@@ -508,13 +683,18 @@ class InteractiveCLI:
                 self.wait_for_enter()
                 return
             
-            available_currencies = []
+            wallets = portfolio.wallets
+            # dict сохраняет порядок кошельков для вывода и даёт O(1) проверку выбора
+            available_currencies = {
+                code: wallet for code, wallet in wallets.items()
+                if wallet.balance > 0 and code != 'USD'
+            }
             print('Доступные валюты для продажи:')
-            for currency_code, wallet in portfolio.wallets.items():
-                if wallet.balance > 0 and currency_code != 'USD':
-                    available_currencies.append(currency_code)
-                    balance_str = f'{wallet.balance:.8f}' if currency_code in ['BTC', 'ETH'] else f'{wallet.balance:.4f}'
-                    print(f'  {currency_code}: {balance_str}')
+            if available_currencies:
+                print('\n'.join(
+                    f'  {code}: {_PRECISE_BALANCE_FMT.get(code, _DEFAULT_PRECISE_BALANCE_FMT).format(wallet.balance)}'
+                    for code, wallet in available_currencies.items()
+                ))
             
             if not available_currencies:
                 print('Ошибка: У вас нет валют для продажи!')
@@ -522,14 +702,14 @@ class InteractiveCLI:
                 return
             
             print()
-            currency_code = self.get_user_input('Код валюты для продажи: ').upper()
+            currency_code = _canon(self.get_user_input('Код валюты для продажи: '))
             
             if currency_code not in available_currencies:
                 print(f'\nОшибка: У вас нет валюты {currency_code} для продажи или валюта недоступна!')
                 self.wait_for_enter()
                 return
             
-            wallet = portfolio.wallets[currency_code]
+            wallet = available_currencies[currency_code]
             max_amount = wallet.balance
             
             print(f'\nДоступно для продажи: {max_amount} {currency_code}')
@@ -545,9 +725,9 @@ class InteractiveCLI:
                     age = self.rate_manager.get_rates_age()
                     print(f'\n⚠ Данные курсов могут быть устаревшими ({age}).')
                     print('  Для актуальных курсов выполните команду update-rates.\n')
-                rate = self.rate_manager.get_rate(currency_code, 'USD')[0]
+                rate = self._get_rate(currency_code, 'USD')[0]
                 revenue = amount * rate
-                current_usd_balance = portfolio.wallets['USD'].balance if 'USD' in portfolio.wallets else 0
+                current_usd_balance = wallets['USD'].balance if 'USD' in wallets else 0
                 print('\nДетали продажи:')
                 print(f'   Валюта: {currency_code}')
                 print(f'   Количество: {amount}')
@@ -589,15 +769,13 @@ class InteractiveCLI:
                     print(f'\n{e}')
                 except Exception as e:
                     print(f'\nОшибка: Ошибка при выполнении операции: {repr(e)}')
-                    import traceback
-                    traceback.print_exc()
+                    _print_traceback()
             else:
                 print('\nПродажа отменена.')
         
         except Exception as e:
             print(f'\n Ошибка: Общая ошибка: {repr(e)}')
-            import traceback
-            traceback.print_exc()
+            _print_traceback()
         
         self.wait_for_enter()
 
@@ -610,13 +788,8 @@ class InteractiveCLI:
         self.clear_screen()
         self.print_header('Процедура: Курс валюты (get-rate)')
 
-        from_currency = self.get_user_input('Исходная валюта (from, напр. USD): ').strip().upper()
-        to_currency = self.get_user_input('Целевая валюта (to, напр. BTC): ').strip().upper()
-
-        if not from_currency or not to_currency:
-            print('\nКоды валют не могут быть пустыми.')
-            self.wait_for_enter()
-            return
+        from_currency = _canon(self.get_user_input('Исходная валюта (from, напр. USD): '))
+        to_currency = _canon(self.get_user_input('Целевая валюта (to, напр. BTC): '))
 
         if from_currency == to_currency:
             print('\nИсходная и целевая валюта совпадают. Курс: 1.0000')
@@ -624,8 +797,8 @@ class InteractiveCLI:
             return
 
         try:
-            get_currency(from_currency)
-            get_currency(to_currency)
+            _validate_currency(from_currency)
+            _validate_currency(to_currency)
         except CurrencyNotFoundError as e:
             print(f'\n{e}')
             print(self._currency_not_found_hint())
@@ -644,7 +817,7 @@ class InteractiveCLI:
                 except Exception:
                     pass
 
-            rate, updated_at = self.rate_manager.get_rate(from_currency, to_currency)
+            rate, updated_at = self._get_rate(from_currency, to_currency)
             age_str = self.rate_manager.get_rates_age()
 
             rate_fmt = f'{rate:,.4f}' if rate >= 1000 else f'{rate:.4f}'
@@ -674,7 +847,7 @@ class InteractiveCLI:
         print()
         currency = input('Валюта (Enter = все): ').strip() or None
         top_input = input('Топ N (Enter = все): ').strip()
-        base_input = input('База (Enter = USD): ').strip().upper() or 'USD'
+        base_input = _canon(input('База (Enter = USD): '))
         top = None
         if top_input:
             try:
@@ -695,129 +868,64 @@ class InteractiveCLI:
         Читает кеш, применяет фильтры, сортирует, выводит таблицу и время обновления.
         Ошибки: пустой/не найден кеш → сообщение про update-rates; валюта не найдена → курс не найден в кеше.
         """
-        base_currency = (base or 'USD').upper()
+        base_currency = _canon(base)
         try:
-            rates_data = db.load_data('rates') or {}
-            pairs = rates_data.get('pairs', {})
-            if not pairs and rates_data.get('rates') is not None:
-                pairs = {
-                    p: {'rate': v, 'updated_at': rates_data.get('timestamp'), 'source': ''}
-                    for p, v in rates_data.get('rates', {}).items()
-                }
-            timestamp = rates_data.get('last_refresh') or rates_data.get('timestamp') or '—'
-
-            if not pairs:
+            cached_rows, timestamp = self._load_rates_cache()
+            timestamp = timestamp or '—'
+
+            if not cached_rows:
                 print("Локальный кеш курсов пуст. Выполните 'update-rates', чтобы загрузить данные.")
                 self.wait_for_enter()
                 return
 
-            # Строим список курсов относительно базы (в т.ч. база != USD через пересчёт)
-            rows = []
+            # Один проход: курс к USD по каждой валюте (с фильтром --currency) и курс базы к USD
+            currency_filter = _canon(currency) if currency else None
+            entries = []
             base_rate_to_usd = None
-            for pair, info in pairs.items():
-                if '_' not in pair:
-                    continue
-                rate_val = float(info.get('rate') if isinstance(info, dict) else info or 0)
-                from_c, to_c = pair.split('_', 1)
-                updated_at = info.get('updated_at') if isinstance(info, dict) else timestamp
-                source = info.get('source', '') if isinstance(info, dict) else ''
+            for _, from_c, to_c, rate_val, _, _ in cached_rows:
+                # Курс базы к USD определяется в этом же проходе (обе ориентации пары)
                 if from_c == base_currency and to_c == 'USD':
                     base_rate_to_usd = rate_val
-                elif to_c == base_currency and from_c == 'USD':
-                    base_rate_to_usd = 1.0 / rate_val if rate_val else None
-                rows.append({
-                    'pair': pair,
-                    'from_currency': from_c,
-                    'to_currency': to_c,
-                    'rate_to_usd': rate_val if to_c == 'USD' else (1.0 / rate_val if rate_val else 0),
-                    'updated_at': updated_at,
-                    'source': source,
-                })
-
-            if base_currency != 'USD' and base_rate_to_usd is None:
-                for r in rows:
-                    if r['from_currency'] == base_currency and r['to_currency'] == 'USD':
-                        base_rate_to_usd = r['rate_to_usd']
-                        break
-                    if r['from_currency'] == 'USD' and r['to_currency'] == base_currency:
-                        base_rate_to_usd = 1.0 / r['rate_to_usd'] if r['rate_to_usd'] else None
-                        break
-                if base_rate_to_usd is None:
-                    base_rate_to_usd = 1.0
-
-            display_list = []
-            for r in rows:
-                to_usd = r['rate_to_usd']
-                curr = r['from_currency'] if r['to_currency'] == 'USD' else r['to_currency']
+                elif from_c == 'USD' and to_c == base_currency and rate_val:
+                    base_rate_to_usd = 1.0 / rate_val
+                curr = from_c if to_c == 'USD' else to_c
+                if currency_filter and curr != currency_filter:
+                    continue
                 if base_currency == 'USD':
-                    rate_in_base = to_usd if r['to_currency'] == 'USD' else (1.0 / to_usd if to_usd else 0)
-                    pair_display = f"{curr}_USD"
+                    # Для базы USD курс в базе совпадает с курсом пары из кеша
+                    entries.append((rate_val, curr))
                 else:
-                    rate_in_base = to_usd / base_rate_to_usd if base_rate_to_usd else 0
-                    pair_display = f"{curr}_{base_currency}"
-                display_list.append({
-                    'pair': pair_display,
-                    'rate': rate_in_base,
-                    'updated_at': r['updated_at'],
-                    'source': r['source'],
-                    'currency': curr,
-                })
-
-            if currency:
-                display_list = [x for x in display_list if x['currency'].upper() == currency.upper()]
-                if not display_list:
-                    print(f"Курс для '{currency}' не найден в кеше.")
-                    self.wait_for_enter()
-                    return
+                    entries.append((rate_val if to_c == 'USD' else (1.0 / rate_val if rate_val else 0), curr))
+
+            if currency_filter and not entries:
+                print(f"Курс для '{currency}' не найден в кеше.")
+                self.wait_for_enter()
+                return
+
+            if base_currency != 'USD':
+                if base_rate_to_usd is None:
+                    base_rate_to_usd = 1.0
+                entries = [(to_usd / base_rate_to_usd if base_rate_to_usd else 0, curr) for to_usd, curr in entries]
 
             if top:
-                display_list.sort(key=lambda x: x['rate'], reverse=True)
-                display_list = display_list[:top]
+                # Частичный отбор O(N log top) вместо полной сортировки
+                entries = heapq.nlargest(top, entries, key=lambda x: x[0])
             else:
-                display_list.sort(key=lambda x: x['pair'])
+                entries.sort(key=lambda x: x[1])
 
-            print(f"Rates from cache (updated at {timestamp}):")
-            for x in display_list:
-                rate_fmt = f"{x['rate']:,.2f}" if x['rate'] >= 1 else f"{x['rate']:.6f}"
-                print(f"- {x['pair']}: {rate_fmt}")
+            # Строки собираются по готовым шаблонам и выводятся одной записью
+            out = [f"Rates from cache (updated at {timestamp}):"]
+            out.extend(
+                (_RATE_LINE_BIG if rate_in_base >= 1 else _RATE_LINE_SMALL)(curr, base_currency, rate_in_base)
+                for rate_in_base, curr in entries
+            )
+            sys.stdout.write('\n'.join(out) + '\n')
             if not self.rate_manager.is_rates_data_fresh():
                 print("Предупреждение: данные могут быть устаревшими. Выполните 'update-rates'.")
         except Exception as e:
             print(f"Ошибка при получении курсов: {e}")
         self.wait_for_enter()
 
-    def _display_rates_table(self, rates, base_currency, timestamp):
-        """Отображение таблицы с курсами (Валюта, Курс, Обновлено, Источник)."""
-        from datetime import datetime
-
-        from prettytable import PrettyTable
-        if not rates:
-            print('Нет данных для отображения.')
-            return
-        table = PrettyTable()
-        table.field_names = ['Валюта', f'Курс ({base_currency})', 'Обновлено', 'Источник']
-        table.align['Валюта'] = 'l'
-        table.align[f'Курс ({base_currency})'] = 'r'
-        for rate_info in rates:
-            currency = rate_info.get('currency', '')
-            rate = rate_info.get('rate', 0)
-            row_ts = rate_info.get('updated_at') or timestamp
-            source = rate_info.get('source', '') or '—'
-            formatted_rate = f'{rate:,.2f}' if rate >= 1 else f'{rate:.6f}'
-            update_time = '—'
-            if row_ts:
-                try:
-                    update_dt = datetime.fromisoformat(str(row_ts).replace('Z', '+00:00'))
-                    update_time = update_dt.strftime('%H:%M:%S')
-                except (ValueError, AttributeError):
-                    update_time = str(row_ts)[:19] if row_ts else '—'
-            table.add_row([currency, formatted_rate, update_time, source])
-        print('\n' + '-' * 50)
-        print('КУРСЫ ВАЛЮТ')
-        print('-' * 50)
-        print(table)
-        print(f'\nВсего: {len(rates)}')
-    
     def show_currency_info(self):
         '''
         Показать информацию о валютах с проверкой актуальности
@@ -845,7 +953,7 @@ class InteractiveCLI:
         '''
         Выход из приложения
         '''
-        print('\nВыход из программы ValutaTrade Hub!')
+        print('\nВыход из программы ValutaTrade Hub!', flush=True)
         sys.exit(0)
 
 
@@ -856,36 +964,25 @@ class InteractiveCLI:
         if not user_input:
             return None
             
-        user_input = user_input.strip().lower()
-        
-        if user_input in self.digit_mapping:
-            return self.digit_mapping[user_input]
-        
-        if user_input in self.menu_options:
-            return user_input
-        
-        matches = [cmd for cmd in self.menu_options.keys() 
-                   if cmd.startswith(user_input) and len(user_input) >= 2]
-        
-        if len(matches) == 1:
-            return matches[0]
-        
-        return None
+        return self._prefix_index.get(user_input.strip().lower())
     
     def run(self):
         '''
-        Запуск интерактивного интерфейса
+        Запуск интерактивного интерфейса.
+        Вывод буферизуется целиком на экран: сброс stdout происходит на границе ввода (input/_read_line).
         '''
+        if hasattr(sys.stdout, 'reconfigure'):
+            sys.stdout.reconfigure(line_buffering=False)
         while True:
             try:
                 self.show_main_menu()
                 
                 choice = input('Список доступных команд (введите текстовую команду или число 1-12): ').strip()
                 
-                command = self.get_command(choice)
+                entry = self.menu_options.get(self.get_command(choice))
                 
-                if command:
-                    _, handler = self.menu_options[command]
+                if entry:
+                    _, handler = entry
                     handler()
                 else:
                     print(f'\n Ошибка: Неверный выбор: "{choice}"! Пожалуйста, выберите от 1 до 12 или используйте команды из меню.')
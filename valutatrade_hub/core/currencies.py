@@ -1,6 +1,7 @@
 # valutatrade_hub/core/currencies.py
 from abc import ABC, abstractmethod
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 from .exceptions import CurrencyNotFoundError
 from .utils import normalize_currency_code, validate_currency_code
@@ -11,11 +12,14 @@ class Currency(ABC):
     Абстрактный базовый класс валюты.
     Инварианты: code — верхний регистр, 2–5 символов, без пробелов; name — не пустая строка.
     '''
+    __slots__ = ('_name', '_code', '_display_info')
+
     def __init__(self, name: str, code: str):
         self._code = validate_currency_code(code)
         if not name or not name.strip():
             raise ValueError('Ошибка: Название валюты не может быть пустым')
         self._name = name.strip()
+        self._display_info: Optional[str] = None  # кеш get_display_info: атрибуты неизменяемы
     
     @property
     def name(self) -> str:
@@ -30,32 +34,47 @@ class Currency(ABC):
         pass
 
 class FiatCurrency(Currency):
+    __slots__ = ('_issuing_country',)
+
     def __init__(self, name: str, code: str, issuing_country: str):
         super().__init__(name, code)
         self._issuing_country = issuing_country
     
     def get_display_info(self) -> str:
-        return f'[FIAT] {self._code} — {self._name} (Issuing: {self._issuing_country})'
+        if self._display_info is None:
+            self._display_info = f'[FIAT] {self._code} — {self._name} (Issuing: {self._issuing_country})'
+        return self._display_info
     
 
 class CryptoCurrency(Currency):
+    __slots__ = ('_algorithm', '_market_cap')
+
     def __init__(self, name: str, code: str, algorithm: str, market_cap: float = 0.0):
         super().__init__(name, code)
         self._algorithm = algorithm
         self._market_cap = market_cap
     
     def get_display_info(self) -> str:
-        mcap_str = f'{self._market_cap:.2e}' if self._market_cap > 1e6 else f'{self._market_cap:,.2f}'
-        return f'[CRYPTO] {self._code} — {self._name} (Algo: {self._algorithm}, MCAP: {mcap_str})'
+        if self._display_info is None:
+            mcap_str = f'{self._market_cap:.2e}' if self._market_cap > 1e6 else f'{self._market_cap:,.2f}'
+            self._display_info = f'[CRYPTO] {self._code} — {self._name} (Algo: {self._algorithm}, MCAP: {mcap_str})'
+        return self._display_info
 
 # Реестр валют
 class CurrencyRegistry:
     _currencies: Dict[str, Currency] = {}
+    _version: int = 0
     
     @classmethod
     def register_currency(cls, currency: Currency) -> None:
         """Регистрирует валюту в реестре по её коду."""
         cls._currencies[currency.code] = currency
+        cls._version += 1
+
+    @classmethod
+    def get_version(cls) -> int:
+        """Счётчик изменений реестра: увеличивается при каждой регистрации валюты."""
+        return cls._version
 
     @classmethod
     def get_currency(cls, code: str) -> Currency:
@@ -66,9 +85,9 @@ class CurrencyRegistry:
         return cls._currencies[code]
 
     @classmethod
-    def get_all_currencies(cls) -> Dict[str, Currency]:
-        """Возвращает копию словаря всех зарегистрированных валют."""
-        return cls._currencies.copy()
+    def get_all_currencies(cls) -> Mapping[str, Currency]:
+        """Возвращает представление всех зарегистрированных валют только для чтения (без копирования)."""
+        return MappingProxyType(cls._currencies)
 
 
 def initialize_currencies() -> None:
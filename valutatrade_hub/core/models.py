@@ -1,8 +1,11 @@
 # valutatrade_hub/core/models.py
 import hashlib
+import hmac
+import math
 import secrets
 from datetime import datetime
-from typing import Callable, Dict, Optional
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional
 
 from .currencies import get_currency
 from .exceptions import InsufficientFundsError
@@ -10,28 +13,35 @@ from .utils import convert_amount, normalize_currency_code
 
 
 class User:
+    __slots__ = ('_user_id', '_username', '_salt', '_salt_bytes', '_hashed_password', '_registration_date')
+
     def __init__(self, user_id: int, username: str, password: str,
                  salt: Optional[str] = None,
                  registration_date: Optional[datetime] = None):
         self._user_id = user_id
         self.username = username  # setter проверяет непустое имя
         self._salt = salt or secrets.token_hex(8)
+        self._salt_bytes = self._salt.encode('utf-8')
         if salt is None and len(password) < 4:
             raise ValueError('Ошибка: Минимальная длина пароля - 4 символа')
         self._hashed_password = self._hash_password(password)
-        self._registration_date = registration_date or datetime.now()
+        self._registration_date = registration_date  # None — дата фиксируется при первом чтении
     
     def _hash_password(self, password: str) -> str:
         '''
-        Хеширование пароля с солью
+        Хеширование пароля с солью (соль закодирована один раз в __init__).
+        Формат — hex-строка, как в users.json: sha256(пароль + соль).
+        Соль подаётся вторым update(), без промежуточной склейки байтов.
         '''
-        return hashlib.sha256((password + self._salt).encode()).hexdigest()
+        h = hashlib.sha256(password.encode('utf-8'))
+        h.update(self._salt_bytes)
+        return h.hexdigest()
     
     def verify_password(self, password: str) -> bool:
         '''
-        Проверка пароля
+        Проверка пароля (сравнение за постоянное время)
         '''
-        return self._hashed_password == self._hash_password(password)
+        return hmac.compare_digest(self._hashed_password, self._hash_password(password))
     
     def change_password(self, new_password: str) -> None:
         '''
@@ -47,7 +57,7 @@ class User:
         '''
         return (f'User ID: {self._user_id}, '
                 f'Username: {self._username}, '
-                f'Registered: {self._registration_date.strftime('%Y-%m-%d %H:%M')}')
+                f'Registered: {self.registration_date.strftime('%Y-%m-%d %H:%M')}')
     
     # Геттеры - необходимы для безопасного доступа к атрибутам, нельзя изменить напрямую данные
     @property
@@ -66,6 +76,12 @@ class User:
     
     @property
     def registration_date(self) -> datetime:
+        '''
+        Дата регистрации. Если не передана в конструктор — берётся текущее время
+        при первом обращении и дальше не меняется.
+        '''
+        if self._registration_date is None:
+            self._registration_date = datetime.now()
         return self._registration_date
 
 def _validate_amount(value: float, context: str = 'Сумма') -> None:
@@ -78,27 +94,45 @@ def _validate_amount(value: float, context: str = 'Сумма') -> None:
         raise ValueError(f'Ошибка: {context} не может быть отрицательной')
 
 
+def _positive_amount(value: float, context: str) -> float:
+    """Проверяет сумму операции одним условием в частом случае; в остальных — те же ошибки, что раньше."""
+    if isinstance(value, (int, float)) and value > 0:  # NaN > 0 ложно
+        return float(value)
+    _validate_amount(value, context)
+    raise ValueError(f'Ошибка: {context} должна быть положительной')
+
+
+def _checked_balance(value: float) -> float:
+    """Проверяет значение баланса (число, не NaN, неотрицательное) и возвращает его как float."""
+    if not isinstance(value, (int, float)):
+        raise TypeError(
+            f'Ошибка: Баланс должен быть числом, получено: {type(value).__name__}'
+        )
+    if value != value:  # NaN
+        raise ValueError('Ошибка: Баланс не может быть NaN')
+    if value < 0:
+        raise ValueError('Ошибка: Баланс не может быть отрицательным')
+    return float(value)
+
+
 class Wallet:
+    __slots__ = ('currency_code', '_balance')
+
     def __init__(self, currency_code: str, balance: float = 0.0):
         self.currency_code = normalize_currency_code(currency_code)
-        self._balance = 0.0
-        self.balance = balance  # через setter — валидация
+        self._balance = _checked_balance(balance)
 
     def deposit(self, amount: float) -> None:
         """Пополнение баланса."""
-        _validate_amount(amount, 'Сумма пополнения')
-        if amount <= 0:
-            raise ValueError('Ошибка: Сумма пополнения должна быть положительной')
-        self.balance += amount
+        # Баланс после пополнения положительной суммой валиден — сеттер не нужен
+        self._balance += _positive_amount(amount, 'Сумма пополнения')
 
     def withdraw(self, amount: float) -> None:
         """Снятие средств. Проверяет остаток перед списанием."""
-        _validate_amount(amount, 'Сумма снятия')
-        if amount <= 0:
-            raise ValueError('Ошибка: Сумма снятия должна быть положительной')
-        if amount > self._balance:
+        value = _positive_amount(amount, 'Сумма снятия')
+        if value > self._balance:
             raise InsufficientFundsError(self._balance, amount, self.currency_code)
-        self.balance -= amount
+        self._balance -= value
 
     def get_balance_info(self) -> str:
         """Возвращает читаемую строку: 'Валюта: баланс', например 'USD: 100.00'."""
@@ -110,15 +144,7 @@ class Wallet:
 
     @balance.setter
     def balance(self, value: float) -> None:
-        if not isinstance(value, (int, float)):
-            raise TypeError(
-                f'Ошибка: Баланс должен быть числом, получено: {type(value).__name__}'
-            )
-        if value != value:  # NaN
-            raise ValueError('Ошибка: Баланс не может быть NaN')
-        if value < 0:
-            raise ValueError('Ошибка: Баланс не может быть отрицательным')
-        self._balance = float(value)
+        self._balance = _checked_balance(value)
         
 
 # Фиктивные курсы для get_total_value при отсутствии get_rate (1 единица валюты = X USD)
@@ -136,8 +162,15 @@ STUB_RATES_TO_USD: Dict[str, float] = {
     'DOT': 7.0,
 }
 
+# Обратные фиктивные курсы (1 USD = X единиц валюты), считаются один раз при импорте
+_STUB_BASE_PER_USD: Dict[str, float] = {
+    code: 1.0 / rate for code, rate in STUB_RATES_TO_USD.items() if rate > 0
+}
+
 
 class Portfolio:
+    __slots__ = ('_user_id', '_wallets', '_user')
+
     def __init__(
         self,
         user_id: int,
@@ -162,42 +195,62 @@ class Portfolio:
         '''
         Возвращает кошелёк по коду валюты (создаёт новый, если не существует).
         '''
-        currency_code = normalize_currency_code(currency_code)
-        if currency_code not in self._wallets:
-            self._wallets[currency_code] = Wallet(currency_code, 0.0)
-        return self._wallets[currency_code]
+        return self._get_wallet_fast(normalize_currency_code(currency_code))
+
+    def _get_wallet_fast(self, code: str) -> Wallet:
+        '''
+        То же, что get_wallet, но без нормализации: для внутренних вызовов с уже каноничным кодом.
+        '''
+        wallet = self._wallets.get(code)
+        if wallet is None:
+            wallet = self._wallets[code] = Wallet(code, 0.0)
+        return wallet
 
     def get_total_value(
         self,
         base_currency: str = 'USD',
-        get_rate: Optional[Callable[[str, str], float]] = None,
+        get_rate: Optional[Callable[[str, str], Optional[float]]] = None,
     ) -> float:
         '''
         Общая стоимость всех валют в базовой валюте (по курсам или фиктивным данным).
+        get_rate(code, base) возвращает курс или None, если курс недоступен (такой кошелёк не учитывается);
+        исключения обрабатывает сам источник курсов.
         '''
         base_currency = normalize_currency_code(base_currency)
+        if not get_rate:
+            return self._get_stub_total_value(base_currency)
         total = 0.0
+        convert = convert_amount  # локальная ссылка вместо поиска в globals на каждой итерации
         for code, wallet in self._wallets.items():
             if code == base_currency:
-                total += wallet.balance
-            elif get_rate:
-                try:
-                    rate = get_rate(code, base_currency)
-                    total += convert_amount(wallet.balance, rate)
-                except Exception:
-                    pass
+                total += wallet._balance
             else:
-                # Фиктивные курсы: конвертируем в USD, затем в base_currency
-                to_usd = STUB_RATES_TO_USD.get(code, 0.0)
-                usd_value = convert_amount(wallet.balance, to_usd)
-                if base_currency == 'USD':
-                    total += usd_value
-                else:
-                    usd_per_base = STUB_RATES_TO_USD.get(base_currency)
-                    if usd_per_base and usd_per_base > 0:
-                        total += convert_amount(usd_value, 1.0 / usd_per_base)
+                rate = get_rate(code, base_currency)
+                if rate is None or rate < 0:
+                    continue
+                # Без промежуточного округления: слагаемые суммируются, округление копило бы ошибку
+                total += convert(wallet._balance, rate, round_digits=None)
         return total
 
+    def _get_stub_total_value(self, base_currency: str) -> float:
+        '''
+        Стоимость по фиктивным курсам: одна сумма balance * курс_к_USD по всем не-базовым кошелькам,
+        затем однократный пересчёт USD → base_currency.
+        '''
+        base_wallet = self._wallets.get(base_currency)
+        base_total = base_wallet._balance if base_wallet is not None else 0.0
+        base_per_usd = _STUB_BASE_PER_USD.get(base_currency)
+        if base_per_usd is None:
+            # Нет фиктивного курса базы — остальные кошельки пересчитать нельзя
+            return base_total
+        rate_to_usd = STUB_RATES_TO_USD.get
+        # Скалярное произведение балансов на курсы считается в C (math.sumprod, Python 3.12+)
+        usd_total = math.sumprod(
+            (wallet._balance for code, wallet in self._wallets.items() if code != base_currency),
+            (rate_to_usd(code, 0.0) for code in self._wallets if code != base_currency),
+        )
+        return base_total + usd_total * base_per_usd
+
     @property
     def user(self) -> Optional['User']:
         '''Геттер: объект пользователя (без возможности перезаписи).'''
@@ -208,6 +261,6 @@ class Portfolio:
         return self._user_id
 
     @property
-    def wallets(self) -> Dict[str, Wallet]:
-        '''Геттер: копия словаря кошельков.'''
-        return self._wallets.copy()
+    def wallets(self) -> Mapping[str, Wallet]:
+        '''Геттер: представление кошельков только для чтения (без копирования словаря).'''
+        return MappingProxyType(self._wallets)
@@ -12,6 +12,8 @@ DatabaseManager/JSON: все записи через db.update_data(entity, upda
 
 Применение @log_action: register_user, login, buy_currency (verbose=True), sell_currency (verbose=True).
 """
+import time
+import traceback
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, Tuple
 
@@ -87,7 +89,6 @@ class UserManager:
             return user
             
         except Exception:
-            import traceback
             traceback.print_exc()
             raise
         
@@ -155,15 +156,16 @@ class PortfolioManager:
         if amount <= 0:
             raise ValueError('Количество должно быть положительным')
         
-        get_currency(currency_code)
-        get_currency(base_currency)
+        # Каноничные коды из реестра: кошельки берутся без повторной нормализации
+        target_code = get_currency(currency_code).code
+        base_code = get_currency(base_currency).code
 
         portfolio = self.get_user_portfolio(user_id)
         rate_manager = RateManager()
         rate, _ = rate_manager.get_rate(currency_code, base_currency)
         cost_in_base_currency = convert_amount(amount, rate)
 
-        base_wallet = portfolio.get_wallet(base_currency)
+        base_wallet = portfolio._get_wallet_fast(base_code)
         if base_wallet.balance < cost_in_base_currency:
             raise InsufficientFundsError(
                 base_wallet.balance, cost_in_base_currency, base_currency
@@ -171,7 +173,7 @@ class PortfolioManager:
         old_base_balance = base_wallet.balance
         base_wallet.withdraw(cost_in_base_currency)
         
-        target_wallet = portfolio.get_wallet(currency_code)
+        target_wallet = portfolio._get_wallet_fast(target_code)
         old_target_balance = target_wallet.balance
         old_base_balance = base_wallet.balance
         target_wallet.deposit(amount)
@@ -200,7 +202,7 @@ class PortfolioManager:
         if currency_code == base_currency:
             raise ValueError(f'Ошибка: Базовую валюту {base_currency} нельзя продать')
         get_currency(currency_code)
-        get_currency(base_currency)
+        base_code = get_currency(base_currency).code
 
         portfolio = self.get_user_portfolio(user_id)
         if currency_code not in portfolio.wallets:
@@ -216,7 +218,7 @@ class PortfolioManager:
         
         wallet.withdraw(amount)
         
-        base_wallet = portfolio.get_wallet(base_currency)
+        base_wallet = portfolio._get_wallet_fast(base_code)
         old_base_balance = base_wallet.balance
         base_wallet.deposit(revenue_in_base_currency)
         
@@ -283,21 +285,33 @@ class RateManager:
     def __init__(self):
         self.rates_ttl = settings.get('rates_ttl_seconds', 300)
         self.currency_info_ttl = settings.get('currency_info_ttl_seconds', 3600)
+        # (mtime_ns, size) файла rates.json и момент (epoch), до которого данные свежие
+        self._rates_fresh_until: Optional[Tuple[Tuple[int, int], float]] = None
     
     def is_rates_data_fresh(self) -> bool:
         '''
         Проверяет, актуальны ли данные о курсах. TTL из SettingsLoader.
+        Срок свежести вычисляется один раз на версию файла; дальше — только сравнение с текущим временем.
         '''
+        stamp = db.file_stamp(db.path_for('rates'))
+        cached = self._rates_fresh_until
+        if stamp is not None and cached is not None and cached[0] == stamp:
+            return time.time() < cached[1]
+
         rates_data = db.load_data('rates') or {}
         ts = rates_data.get('last_refresh') or rates_data.get('timestamp')
-        if not ts:
-            return False
-        try:
-            last_update = datetime.fromisoformat(ts.replace('Z', '+00:00'))
-            time_diff = datetime.now(timezone.utc) - last_update
-            return time_diff.total_seconds() < self.rates_ttl
-        except (ValueError, TypeError):
-            return False
+        deadline = 0.0
+        if ts:
+            try:
+                last_update = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+                if last_update.tzinfo is None:
+                    raise TypeError('naive timestamp')  # как и раньше: сравнение с aware-временем невозможно
+                deadline = last_update.timestamp() + self.rates_ttl
+            except (ValueError, TypeError):
+                deadline = 0.0
+        if stamp is not None:
+            self._rates_fresh_until = (stamp, deadline)
+        return time.time() < deadline
     
     def is_currency_info_fresh(self) -> bool:
         '''
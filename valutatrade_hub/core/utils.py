@@ -2,14 +2,18 @@
 """
 Утилиты для валидации валютных кодов и конвертации сумм.
 """
+import sys
+from functools import lru_cache
 from typing import Optional
 
 
+@lru_cache(maxsize=512)
 def validate_currency_code(code: str) -> str:
     """
     Валидирует код валюты.
     
     Требования: 2–5 латинских букв, без пробелов. Регистр нормализуется в верхний.
+    Успешные результаты мемоизируются (ошибки не кешируются) и интернируются.
     
     Args:
         code: Сырой код валюты (например, 'usd', 'BTC').
@@ -38,7 +42,7 @@ def validate_currency_code(code: str) -> str:
     if ' ' in normalized:
         raise ValueError('Ошибка: Код валюты не должен содержать пробелы')
     
-    return normalized
+    return sys.intern(normalized)
 
 
 def convert_amount(
@@ -77,9 +81,11 @@ def convert_amount(
     return result
 
 
+@lru_cache(maxsize=512)
 def normalize_currency_code(code: str) -> str:
     """
     Нормализует код валюты (приводит к верхнему регистру, убирает пробелы).
+    Результат мемоизируется и интернируется: набор кодов мал, функция чистая.
     Не выполняет полную валидацию — используйте validate_currency_code при вводе от пользователя.
     
     Args:
@@ -90,4 +96,4 @@ def normalize_currency_code(code: str) -> str:
     """
     if code is None:
         return ''
-    return (code or '').strip().upper()
+    return sys.intern((code or '').strip().upper())
@@ -2,7 +2,7 @@
 """
 Декоратор @log_action — логирование доменных операций (BUY/SELL/REGISTER/LOGIN).
 
-Поля логов: timestamp (ISO), action, username или user_id, currency_code, amount,
+Поля логов: timestamp (ISO, из %(asctime)s форматтера), action, username или user_id, currency_code, amount,
 rate и base (если применимо), result (OK/ERROR), при ошибке — error_type, error_message.
 Формат сообщения: одна строка, человекочитаемый, например:
   BUY user_id=1 currency='BTC' amount=0.0500 rate=59300.00 base='USD' result=OK
@@ -10,87 +10,168 @@ rate и base (если применимо), result (OK/ERROR), при ошибк
 Исключения не глотаются — после записи в лог пробрасываются дальше.
 """
 import functools
-from datetime import datetime
-from typing import Any, Callable
+import inspect
+import logging as lg
+from typing import Any, Callable, Dict
 
 from .logging_config import get_logger
 
+_ArgGetter = Callable[[tuple, Dict[str, Any]], Any]
+
+
+def _arg_getter(sig: inspect.Signature, name: str, fallback: Any) -> _ArgGetter:
+    '''
+    Достаёт аргумент name по сигнатуре функции: позиционный индекс вычислен один раз.
+    Если параметра нет или он не передан — значение по умолчанию из сигнатуры, иначе fallback.
+    '''
+    param = sig.parameters.get(name)
+    if param is None:
+        return lambda args, kwargs: kwargs.get(name, fallback)
+    default = fallback if param.default is inspect.Parameter.empty else param.default
+    if param.kind not in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+        return lambda args, kwargs: kwargs.get(name, default)
+    index = list(sig.parameters).index(name)
+    return lambda args, kwargs: args[index] if len(args) > index else kwargs.get(name, default)
+
+
+def _scan_user_info(args: tuple, kwargs: Dict[str, Any]) -> str:
+    '''Запасной поиск пользователя по аргументам — для функций без user_id/username.'''
+    for arg in args:
+        if hasattr(arg, 'user_id'):
+            return f"user_id={arg.user_id}"
+        if hasattr(arg, '_user_id'):
+            return f"user_id={getattr(arg, '_user_id')}"
+        if isinstance(arg, int) and arg > 0:
+            return f"user_id={arg}"
+    return 'unknown'
+
+
+def _user_info_resolver(user_action: str, sig: inspect.Signature) -> Callable[[tuple, Dict[str, Any]], str]:
+    '''Выбирает способ получить идентификатор пользователя: имя (register/login) или user_id.'''
+    if user_action in ('register', 'login') and 'username' in sig.parameters:
+        get_username = _arg_getter(sig, 'username', None)
+
+        def by_username(args, kwargs):
+            username = get_username(args, kwargs)
+            return f"user='{username}'" if isinstance(username, str) else _scan_user_info(args, kwargs)
+        return by_username
+    if 'user_id' in sig.parameters:
+        get_user_id = _arg_getter(sig, 'user_id', None)
+        return lambda args, kwargs: f"user_id={get_user_id(args, kwargs)}"
+    return _scan_user_info
+
+
+def _build_templates(fragments: tuple, head: str, tail: tuple) -> Dict[int, str]:
+    '''
+    Шаблоны %-форматирования для всех сочетаний необязательных полей.
+    Бит i маски включает fragments[i]; tail — фрагменты после обязательной части (тоже по битам дальше).
+    '''
+    optional = fragments + tail[1:]
+    templates = {}
+    for mask in range(1 << len(optional)):
+        pieces = [head]
+        pieces.extend(frag for i, frag in enumerate(fragments) if mask >> i & 1)
+        pieces.append(tail[0])
+        pieces.extend(frag for i, frag in enumerate(tail[1:], len(fragments)) if mask >> i & 1)
+        templates[mask] = ' '.join(pieces)
+    return templates
+
+
+# Биты: currency, amount, rate, base | wallet, base-балансы
+_SUCCESS_TEMPLATES = _build_templates(
+    ("currency='%(currency)s'", "amount=%(amount)s", "rate=%(rate)s", "base='%(base)s'"),
+    "%(action)s %(user)s",
+    ("result=OK", "| wallet %(curr)s %(ob)s→%(nb)s", "base %(obase)s→%(nbase)s"),
+)
+# Биты: currency, amount, base
+_ERROR_TEMPLATES = _build_templates(
+    ("currency='%(currency)s'", "amount=%(amount)s", "base='%(base)s'"),
+    "%(action)s %(user)s",
+    ("result=ERROR error_type=%(error_type)s error_message=%(error_message)s",),
+)
+
+
+def _success_message(user_action: str, verbose: bool, user_info: str, currency_code: Any,
+                     amount: Any, base_currency: Any, result: Any) -> str:
+    '''Строка лога успешной операции (result=OK): один %-шаблон, выбранный по маске полей.'''
+    values = {'action': user_action, 'user': user_info, 'currency': currency_code, 'base': base_currency}
+    mask = 1 if currency_code else 0
+    if amount is not None and amount != '':
+        values['amount'] = f'{amount:.4f}' if isinstance(amount, float) else amount
+        mask |= 2
+    if base_currency:
+        mask |= 8
+    if isinstance(result, dict):
+        rate = result.get('rate')
+        if rate is not None:
+            values['rate'] = f'{rate:.2f}' if isinstance(rate, (int, float)) else rate
+            mask |= 4
+        if verbose:
+            curr = result.get('currency', '')
+            ob = result.get('old_balance')
+            nb = result.get('new_balance')
+            obase = result.get('base_currency_old_balance')
+            nbase = result.get('base_currency_new_balance')
+            if curr is not None and ob is not None and nb is not None:
+                values.update(curr=curr, ob=ob, nb=nb)
+                mask |= 16
+            if obase is not None and nbase is not None:
+                values.update(obase=obase, nbase=nbase)
+                mask |= 32
+    return _SUCCESS_TEMPLATES[mask] % values
+
+
+def _error_message(user_action: str, user_info: str, currency_code: Any,
+                   amount: Any, base_currency: Any, e: Exception) -> str:
+    '''Строка лога неудачной операции (result=ERROR).'''
+    mask = 1 if currency_code else 0
+    if amount is not None and amount != '':
+        mask |= 2
+    if base_currency:
+        mask |= 4
+    return _ERROR_TEMPLATES[mask] % {
+        'action': user_action, 'user': user_info, 'currency': currency_code, 'amount': amount,
+        'base': base_currency, 'error_type': type(e).__name__, 'error_message': repr(str(e)),
+    }
+
 
 def log_action(user_action: str, verbose: bool = False):
     '''
     Декоратор для прозрачной трассировки ключевых операций (buy/sell/register/login).
     user_action: BUY | SELL | register | login.
     verbose: при True добавляет контекст (например, баланс кошелька было→стало).
+    Строка сообщения собирается, только если уровень логгера её пропустит.
     '''
     def decorator(func: Callable) -> Callable:
+        # Сигнатура разбирается один раз: в wrapper — только индексный доступ к args
+        sig = inspect.signature(func)
+        get_user_info = _user_info_resolver(user_action, sig)
+        get_currency_code = _arg_getter(sig, 'currency_code', '')
+        get_amount = _arg_getter(sig, 'amount', 0)
+        get_base_currency = _arg_getter(sig, 'base_currency', '')
+        # Логгер по имени — один и тот же объект на весь процесс, берём его один раз
+        logger = get_logger('actions')
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            logger = get_logger('actions')
-            ts = datetime.now().isoformat()
-
-            user_info = 'unknown'
-            if user_action in ('register', 'login') and len(args) >= 2 and isinstance(args[1], str):
-                user_info = f"user='{args[1]}'"
-            else:
-                for arg in args:
-                    if hasattr(arg, 'user_id'):
-                        user_info = f"user_id={arg.user_id}"
-                        break
-                    if hasattr(arg, '_user_id'):
-                        user_info = f"user_id={getattr(arg, '_user_id')}"
-                        break
-                    if isinstance(arg, int) and arg > 0:
-                        user_info = f"user_id={arg}"
-                        break
-
-            currency_code = kwargs.get('currency_code', '')
-            amount = kwargs.get('amount', 0)
-            base_currency = kwargs.get('base_currency', '')
+            info_enabled = logger.isEnabledFor(lg.INFO)
+            if not info_enabled and not logger.isEnabledFor(lg.ERROR):
+                return func(*args, **kwargs)
 
+            # Время записи ставит сам logging (%(asctime)s в ACTIONS_LOG_FORMAT)
             try:
                 result = func(*args, **kwargs)
-                parts = [f"{user_action} {user_info}"]
-                if currency_code:
-                    parts.append(f"currency='{currency_code}'")
-                if amount is not None and amount != '':
-                    amount_fmt = f'{amount:.4f}' if isinstance(amount, float) else amount
-                    parts.append(f"amount={amount_fmt}")
-                if isinstance(result, dict):
-                    rate = result.get('rate')
-                    if rate is not None:
-                        parts.append(f"rate={rate:.2f}" if isinstance(rate, (int, float)) else f"rate={rate}")
-                    if base_currency:
-                        parts.append(f"base='{base_currency}'")
-                elif base_currency:
-                    parts.append(f"base='{base_currency}'")
-                parts.append("result=OK")
-                if verbose and isinstance(result, dict):
-                    curr = result.get('currency', '')
-                    ob = result.get('old_balance')
-                    nb = result.get('new_balance')
-                    obase = result.get('base_currency_old_balance')
-                    nbase = result.get('base_currency_new_balance')
-                    if curr is not None and ob is not None and nb is not None:
-                        parts.append(f"| wallet {curr} {ob}→{nb}")
-                    if obase is not None and nbase is not None:
-                        parts.append(f"base {obase}→{nbase}")
-                msg = ' '.join(str(p) for p in parts)
-                logger.info(msg, extra={'timestamp': ts})
-                return result
-
             except Exception as e:
-                parts = [f"{user_action} {user_info}"]
-                if currency_code:
-                    parts.append(f"currency='{currency_code}'")
-                if amount is not None and amount != '':
-                    parts.append(f"amount={amount}")
-                if base_currency:
-                    parts.append(f"base='{base_currency}'")
-                parts.append("result=ERROR")
-                parts.append(f"error_type={type(e).__name__}")
-                parts.append(f"error_message={str(e)!r}")
-                msg = ' '.join(str(p) for p in parts)
-                logger.error(msg, extra={'timestamp': ts, 'error_type': type(e).__name__, 'error_message': str(e)})
+                msg = _error_message(user_action, get_user_info(args, kwargs), get_currency_code(args, kwargs),
+                                     get_amount(args, kwargs), get_base_currency(args, kwargs), e)
+                logger.error('%s', msg,
+                             extra={'error_type': type(e).__name__, 'error_message': str(e)})
                 raise
+            if info_enabled:
+                msg = _success_message(user_action, verbose, get_user_info(args, kwargs),
+                                       get_currency_code(args, kwargs), get_amount(args, kwargs),
+                                       get_base_currency(args, kwargs), result)
+                logger.info('%s', msg)
+            return result
         return wrapper
     return decorator
@@ -1,11 +1,17 @@
 # valutatrade_hub/infra/database.py
 import json
 import os
+import traceback
 from threading import Lock
-from typing import Any
+from typing import Any, Optional, Tuple
 
 from .settings import settings
 
+try:
+    import orjson  # опционально: более быстрый разбор JSON
+except ImportError:
+    orjson = None
+
 
 class DatabaseManager:
     '''
@@ -43,11 +49,12 @@ class DatabaseManager:
     
     def _read_file(self, filepath: str) -> Any:
         '''
-        Чтение JSON файла
+        Чтение JSON файла (orjson, если установлен, иначе стандартный json)
         '''
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
         except (json.JSONDecodeError, FileNotFoundError):
             return None
     
@@ -61,6 +68,19 @@ class DatabaseManager:
         except Exception as e:
             raise IOError(f'Ошибка: Ошибка записи в файл {filepath}: {e}')
     
+    def path_for(self, entity: str) -> str:
+        """Путь к JSON-файлу сущности (users, portfolios, rates, exchange_rates)."""
+        return os.path.join(self.data_dir, f'{entity}.json')
+
+    @staticmethod
+    def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+        """Отметка версии файла для кешей: (mtime_ns, size) или None, если файла нет."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
     def load_data(self, entity: str) -> Any:
         """
         Загружает данные по имени сущности.
@@ -71,7 +91,7 @@ class DatabaseManager:
         Returns:
             Десериализованные данные (list/dict) или None при ошибке чтения.
         """
-        filepath = os.path.join(self.data_dir, f'{entity}.json')
+        filepath = self.path_for(entity)
         result = self._read_file(filepath)
         return result
     
@@ -83,7 +103,7 @@ class DatabaseManager:
             entity: Имя сущности (users, portfolios, rates, exchange_rates).
             data: Данные для записи (list, dict — сериализуемые в JSON).
         """
-        filepath = os.path.join(self.data_dir, f'{entity}.json')
+        filepath = self.path_for(entity)
         self._write_file(filepath, data)
         
     def update_data(self, entity: str, update_fn: callable) -> Any:
@@ -104,7 +124,6 @@ class DatabaseManager:
                 self.save_data(entity, updated_data)
                 return updated_data                
             except Exception:
-                import traceback
                 traceback.print_exc()
                 raise
 
@@ -12,8 +12,9 @@ Singleton: единая точка конфигурации приложения
 
 Публичные методы: get(key, default=None) -> Any; reload() — перезагрузка конфигурации.
 """
+import functools
 import os
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 
 def _to_int(value: Any) -> Optional[int]:
@@ -61,16 +62,20 @@ def _parse_env_value(setting_key: str, value: str) -> Any:
     return value
 
 
+_PYPROJECT_PATH = 'pyproject.toml'
+
+# (путь, mtime_ns) → готовые переопределения из [tool.valutatrade]; хранится одна версия файла
+_pyproject_cache: Dict[Tuple[str, int], Dict[str, Any]] = {}
+
+
 def _read_pyproject_section() -> Optional[Dict[str, Any]]:
     """Читает секцию [tool.valutatrade] из pyproject.toml. Возвращает None при ошибке."""
     try:
         import tomllib
     except ImportError:
         return None
-    if not os.path.exists('pyproject.toml'):
-        return None
     try:
-        with open('pyproject.toml', 'rb') as f:
+        with open(_PYPROJECT_PATH, 'rb') as f:
             data = tomllib.load(f)
         tool = data.get('tool', {}).get('valutatrade')
         return tool if isinstance(tool, dict) else None
@@ -78,21 +83,44 @@ def _read_pyproject_section() -> Optional[Dict[str, Any]]:
         return None
 
 
+def _pyproject_overrides() -> Dict[str, Any]:
+    """
+    Значения из [tool.valutatrade], уже приведённые к нужным типам.
+    Файл разбирается один раз на версию (mtime); без pyproject.toml — пустой словарь.
+    """
+    try:
+        key = (_PYPROJECT_PATH, os.stat(_PYPROJECT_PATH).st_mtime_ns)
+    except OSError:
+        return {}
+    cached = _pyproject_cache.get(key)
+    if cached is not None:
+        return cached
+
+    overrides: Dict[str, Any] = {}
+    tool = _read_pyproject_section()
+    if tool:
+        for name, parser in _PYPROJECT_KEYS.items():
+            if name not in tool:
+                continue
+            parsed = parser(tool[name])
+            if parsed is not None:
+                overrides[name] = parsed
+    _pyproject_cache.clear()
+    _pyproject_cache[key] = overrides
+    return overrides
+
+
 class SettingsLoader:
     '''
     Singleton: загрузка и кеширование конфигурации (pyproject.toml [tool.valutatrade], env, дефолты).
     Гарантия: в приложении ровно один экземпляр.
-    Реализация через __new__: простота и читабельность, одна точка инициализации в _load_settings;
-    при любом вызове SettingsLoader() возвращается один и тот же _instance — дополнительные экземпляры не создаются.
+    Экземпляр строит _get_loader() под lru_cache(maxsize=1): при любом вызове SettingsLoader()
+    возвращается один и тот же объект, повторной инициализации и чтения pyproject.toml нет.
     '''
-    _instance = None
-    _settings: Dict[str, Any] = {}
+    __slots__ = ('_settings',)
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(SettingsLoader, cls).__new__(cls)
-            cls._instance._load_settings()
-        return cls._instance
+        return _get_loader()
 
     def _load_settings(self):
         '''Загрузка настроек: дефолты → pyproject.toml [tool.valutatrade] → env.'''
@@ -106,21 +134,13 @@ class SettingsLoader:
             'supported_currencies': ['USD', 'EUR', 'GBP', 'RUB', 'BTC', 'ETH', 'SOL'],
             'api_timeout': 10,
         }
-        self._settings.update(default_settings)
+        self._settings = default_settings
         self._load_pyproject()
         self._load_env()
 
     def _load_pyproject(self) -> None:
-        """Чтение секции [tool.valutatrade] из pyproject.toml при наличии."""
-        tool = _read_pyproject_section()
-        if not tool:
-            return
-        for key, parser in _PYPROJECT_KEYS.items():
-            if key not in tool:
-                continue
-            parsed = parser(tool[key])
-            if parsed is not None:
-                self._settings[key] = parsed
+        """Чтение секции [tool.valutatrade] из pyproject.toml при наличии (разбор кешируется)."""
+        self._settings.update(_pyproject_overrides())
 
     def _load_env(self) -> None:
         """Переменные окружения переопределяют значения."""
@@ -145,8 +165,10 @@ class SettingsLoader:
         return self._settings.get(key, default)
 
     def reload(self) -> None:
-        """Перезагружает конфигурацию: очищает кеш и повторно загружает из pyproject.toml и окружения."""
-        self._settings.clear()
+        """
+        Перезагружает конфигурацию из pyproject.toml и окружения.
+        Экземпляр остаётся тем же, поэтому ссылки на модульный settings не устаревают.
+        """
         self._load_settings()
 
     def __getitem__(self, key: str) -> Any:
@@ -156,5 +178,13 @@ class SettingsLoader:
         self._settings[key] = value
 
 
+@functools.lru_cache(maxsize=1)
+def _get_loader() -> SettingsLoader:
+    '''Единожды создаёт и инициализирует экземпляр SettingsLoader.'''
+    loader = object.__new__(SettingsLoader)
+    loader._load_settings()
+    return loader
+
+
 # Глобальный экземпляр — единственная точка доступа; при импортах создаётся один раз.
 settings = SettingsLoader()
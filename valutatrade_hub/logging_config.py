@@ -10,12 +10,24 @@
   maxBytes=5MB, backupCount=3 (по размеру).
 - logs/valutatrade.log — общий лог: maxBytes=10MB, backupCount=5.
 
+Запись в файлы идёт в фоновом потоке: логгеры кладут записи в очередь (QueueHandler),
+QueueListener пишет их в RotatingFileHandler. Очередь ограничена — при переполнении
+запись отбрасывается, а не блокирует операцию. При выходе слушатели останавливаются (atexit).
+Файлы пишутся через буфер 64 КБ: сброс на диск — когда очередь опустела или раз в секунду
+при непрерывном потоке записей.
+
 Уровень по умолчанию: INFO. Для отладки установить VALUTATRADE_LOG_LEVEL=DEBUG в окружении
 или в [tool.valutatrade] в pyproject.toml (log_level = "DEBUG").
 """
+import atexit
+import io
 import logging as lg
 import logging.handlers as hd
 import os
+import queue
+import sys
+import time
+from typing import List
 
 # Формат: уровень + timestamp (ISO) + сообщение
 ACTIONS_LOG_FORMAT = '%(levelname)s %(asctime)s %(message)s'
@@ -24,18 +36,131 @@ ACTIONS_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S'
 DEFAULT_LOG_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
 DEFAULT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 
+# Предел очереди записей на один файл лога
+LOG_QUEUE_MAXSIZE = 10000
+
+# Буфер файлового потока и максимальный интервал между сбросами на диск (секунды)
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_INTERVAL = 1.0
+
+_listeners: List[hd.QueueListener] = []
+_configured = False
+
+
+class BufferedRotatingFileHandler(hd.RotatingFileHandler):
+    '''
+    RotatingFileHandler с крупным буфером записи. flush() после каждой записи
+    срабатывает не чаще LOG_FLUSH_INTERVAL; немедленный сброс — flush_buffer().
+    Размер файла для ротации считается в памяти: штатный shouldRollover делает
+    seek(0, 2) на каждую запись, а seek сбрасывает буфер.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self._last_flush = time.monotonic()
+        self._stream_size = 0
+        self._record_size = 0
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        raw = io.FileIO(self.baseFilename, self.mode)
+        self._stream_size = os.fstat(raw.fileno()).st_size
+        return io.TextIOWrapper(
+            io.BufferedWriter(raw, buffer_size=LOG_BUFFER_SIZE),
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def shouldRollover(self, record: lg.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        # Как и штатная проверка, длина считается в символах, а не в байтах
+        self._record_size = len(self.format(record)) + len(self.terminator)
+        return 0 < self.maxBytes <= self._stream_size + self._record_size
+
+    def emit(self, record: lg.LogRecord) -> None:
+        super().emit(record)
+        self._stream_size += self._record_size
+
+    def flush(self) -> None:
+        if time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL:
+            self.flush_buffer()
+
+    def flush_buffer(self) -> None:
+        '''Сбрасывает накопленные записи в файл.'''
+        self._last_flush = time.monotonic()
+        super().flush()
+
+
+class _FlushingQueueListener(hd.QueueListener):
+    '''QueueListener, сбрасывающий буферы файлов, как только очередь опустела.'''
+
+    def handle(self, record: lg.LogRecord) -> None:
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, BufferedRotatingFileHandler):
+                    handler.flush_buffer()
+
+
+class _ConsoleHandler(lg.StreamHandler):
+    '''StreamHandler (stderr), сбрасывающий stdout перед записью: CLI буферизует stdout блоками,
+    и без сброса сообщения лога обгоняли бы выведенный ранее текст.'''
+
+    def emit(self, record: lg.LogRecord) -> None:
+        if sys.stdout is not None:
+            sys.stdout.flush()
+        super().emit(record)
+
+
+class _DroppingQueueHandler(hd.QueueHandler):
+    '''QueueHandler, который при переполнении очереди молча отбрасывает запись.'''
+
+    def enqueue(self, record: lg.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def _queued(handler: lg.Handler) -> hd.QueueHandler:
+    '''Оборачивает файловый handler: запись — в очередь, сам файл пишет фоновый QueueListener.'''
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+    listener = _FlushingQueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    if not _listeners:
+        atexit.register(_stop_listeners)
+    _listeners.append(listener)
+    return _DroppingQueueHandler(log_queue)
+
+
+def _stop_listeners() -> None:
+    '''Дописывает оставшиеся в очередях записи и закрывает файлы.'''
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
 
 def setup_logging():
     '''
     Настройка системы логирования: формат, ротация файлов, уровень (INFO по умолчанию).
+    Повторный вызов только обновляет уровень: handlers и слушатели очередей не дублируются.
     '''
+    global _configured
+    log_level = _get_log_level()
+    if _configured:
+        lg.getLogger().setLevel(log_level)
+        lg.getLogger('actions').setLevel(log_level)
+        return
+
     log_dir = 'logs'
     os.makedirs(log_dir, exist_ok=True)
 
     formatter = lg.Formatter(DEFAULT_LOG_FORMAT, datefmt=DEFAULT_DATE_FORMAT)
     actions_formatter = lg.Formatter(ACTIONS_LOG_FORMAT, datefmt=ACTIONS_DATE_FORMAT)
 
-    file_handler = hd.RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         filename=os.path.join(log_dir, 'valutatrade.log'),
         maxBytes=10 * 1024 * 1024,
         backupCount=5,
@@ -43,26 +168,26 @@ def setup_logging():
     )
     file_handler.setFormatter(formatter)
 
-    console_handler = lg.StreamHandler()
+    console_handler = _ConsoleHandler()
     console_handler.setFormatter(formatter)
 
-    log_level = _get_log_level()
     root_logger = lg.getLogger()
     root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
+    root_logger.addHandler(_queued(file_handler))
     root_logger.addHandler(console_handler)
 
     actions_logger = lg.getLogger('actions')
-    actions_handler = hd.RotatingFileHandler(
+    actions_handler = BufferedRotatingFileHandler(
         filename=os.path.join(log_dir, 'actions.log'),
         maxBytes=5 * 1024 * 1024,
         backupCount=3,
         encoding='utf-8',
     )
     actions_handler.setFormatter(actions_formatter)
-    actions_logger.addHandler(actions_handler)
+    actions_logger.addHandler(_queued(actions_handler))
     actions_logger.setLevel(log_level)
     actions_logger.propagate = False
+    _configured = True
 
 
 def _get_log_level():
@@ -3,14 +3,40 @@
 Изоляция логики работы с внешними сервисами. Унифицированный интерфейс fetch_rates() -> dict,
 скрывающий детали (разные URL, форматы ответов). Стандартизированный формат: {"BTC_USD": 59337.21, ...}.
 """
+import json
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from valutatrade_hub.core.exceptions import ApiRequestError
 
+try:
+    import orjson  # опционально: более быстрый разбор JSON-ответов
+except ImportError:
+    orjson = None
+
+# Коды ответа, при которых urllib3 повторяет запрос (с учётом заголовка Retry-After)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Верхняя граница одной паузы между попытками (секунды): и backoff, и Retry-After
+RETRY_MAX_WAIT = 5.0
+
+
+class _CappedRetry(Retry):
+    """Retry, у которого пауза перед повтором не превышает RETRY_MAX_WAIT — даже при большом Retry-After."""
+
+    def get_backoff_time(self) -> float:
+        return min(super().get_backoff_time(), RETRY_MAX_WAIT)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_MAX_WAIT)
+
 
 class BaseApiClient(ABC):
     """
@@ -25,6 +51,22 @@ class BaseApiClient(ABC):
             "User-Agent": "CurrencyParser/1.0",
             "Accept": "application/json",
         })
+        # Повторы и backoff — на уровне адаптера: REQUEST_RETRIES попыток всего.
+        # raise_on_status=False: после последней попытки ответ возвращается и разбирается ниже.
+        # Паузы (backoff и Retry-After) ограничены RETRY_MAX_WAIT — CLI не зависает на минуты.
+        retry = _CappedRetry(
+            total=max(config.REQUEST_RETRIES - 1, 0),
+            backoff_factor=config.RETRY_DELAY,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=("GET",),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # (url, params) → (ETag, Last-Modified, разобранный ответ) для условных GET-запросов
+        self._conditional_cache: Dict[Tuple[str, Tuple], Tuple[Optional[str], Optional[str], Any]] = {}
     
     @abstractmethod
     def fetch_rates(self) -> Dict[str, float]:
@@ -33,48 +75,68 @@ class BaseApiClient(ABC):
     
     def _make_request(self, url: str, params: Optional[Dict] = None) -> Dict:
         """
-        GET-запрос с повторными попытками. Перехват requests.exceptions.RequestException,
+        GET-запрос (повторы выполняет HTTPAdapter сессии). Перехват requests.exceptions.RequestException,
         проверка response.status_code; при ошибке — ApiRequestError с понятным сообщением.
+        Конфигурация валидируется один раз в RatesUpdater, а не на каждую попытку.
+        Если сервер ранее отдал ETag/Last-Modified, запрос условный: на 304 возвращается
+        сохранённый ответ без загрузки и разбора тела.
         """
-        last_error: Optional[Exception] = None
-        for attempt in range(self.config.REQUEST_RETRIES):
-            try:
-                self.config.validate()
-                response = self.session.get(
-                    url,
-                    params=params,
-                    timeout=self.config.REQUEST_TIMEOUT,
+        cache_key = (url, tuple(sorted(params.items())) if params else ())
+        cached = self._conditional_cache.get(cache_key)
+        headers = None
+        if cached is not None:
+            etag, last_modified, _ = cached
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        try:
+            response = self.session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=self.config.REQUEST_TIMEOUT,
+            )
+        except requests.exceptions.RequestException as e:
+            raise ApiRequestError(
+                f"Не удалось выполнить запрос после {self.config.REQUEST_RETRIES} попыток: {e}"
+            ) from e
+        if response.status_code == 304 and cached is not None:
+            return cached[2]
+        if response.status_code != 200:
+            if response.status_code == 429:
+                raise ApiRequestError(
+                    "429 Too Many Requests: превышен лимит запросов. "
+                    "Подождите или уменьшите частоту обновлений."
+                )
+            if response.status_code == 401:
+                raise ApiRequestError(
+                    "401 Unauthorized: неверный или отсутствующий API-ключ. "
+                    "Проверьте переменную EXCHANGERATE_API_KEY."
                 )
-                if response.status_code != 200:
-                    if response.status_code == 429:
-                        raise ApiRequestError(
-                            "429 Too Many Requests: превышен лимит запросов. "
-                            "Подождите или уменьшите частоту обновлений."
-                        )
-                    if response.status_code == 401:
-                        raise ApiRequestError(
-                            "401 Unauthorized: неверный или отсутствующий API-ключ. "
-                            "Проверьте переменную EXCHANGERATE_API_KEY."
-                        )
-                    if response.status_code == 403:
-                        raise ApiRequestError(
-                            "403 Forbidden: доступ запрещён. "
-                            "Возможно, ключ недействителен или превышен лимит плана."
-                        )
-                    if response.status_code >= 500:
-                        raise ApiRequestError(
-                            f"Сервер недоступен (HTTP {response.status_code}). Повторите позже."
-                        )
-                    raise ApiRequestError(f"HTTP {response.status_code}: {response.text[:200]}")
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                last_error = e
-                if attempt == self.config.REQUEST_RETRIES - 1:
-                    raise ApiRequestError(
-                        f"Не удалось выполнить запрос после {self.config.REQUEST_RETRIES} попыток: {last_error}"
-                    ) from e
-                time.sleep(self.config.RETRY_DELAY * (attempt + 1))
-        raise ApiRequestError(f"Все попытки завершились ошибкой: {last_error}")
+            if response.status_code == 403:
+                raise ApiRequestError(
+                    "403 Forbidden: доступ запрещён. "
+                    "Возможно, ключ недействителен или превышен лимит плана."
+                )
+            if response.status_code >= 500:
+                raise ApiRequestError(
+                    f"Сервер недоступен (HTTP {response.status_code}). Повторите позже."
+                )
+            raise ApiRequestError(f"HTTP {response.status_code}: {response.text[:200]}")
+        try:
+            raw = response.content
+            data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except ValueError as e:
+            raise ApiRequestError(f"Некорректный JSON в ответе: {e}") from e
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._conditional_cache[cache_key] = (etag, last_modified, data)
+        else:
+            self._conditional_cache.pop(cache_key, None)
+        return data
 
 
 class CoinGeckoClient(BaseApiClient):
@@ -90,17 +152,21 @@ class CoinGeckoClient(BaseApiClient):
             data = self._make_request(self.config.COINGECKO_URL, params)
         except ApiRequestError:
             raise
-        try:
-            rates: Dict[str, float] = {}
-            base_lower = self.config.BASE_CURRENCY.lower()
-            for crypto_code, gecko_id in self.config.CRYPTO_ID_MAP.items():
-                if gecko_id in data and isinstance(data[gecko_id], dict) and base_lower in data[gecko_id]:
-                    val = data[gecko_id][base_lower]
-                    pair_key = f"{crypto_code}_{self.config.BASE_CURRENCY}"
-                    rates[pair_key] = float(val)
-            return rates
-        except (KeyError, TypeError, ValueError) as e:
-            raise ApiRequestError(f"Ошибка парсинга ответа CoinGecko: {e}") from e
+        if not isinstance(data, dict):
+            raise ApiRequestError(f"Ошибка парсинга ответа CoinGecko: ожидался объект, получено {type(data).__name__}")
+        rates: Dict[str, float] = {}
+        base_currency = self.config.BASE_CURRENCY
+        base_lower = self.config.base_currency_lower
+        for crypto_code, gecko_id in self.config.CRYPTO_ID_MAP.items():
+            entry = data.get(gecko_id)
+            if not entry:
+                continue
+            try:
+                rates[f"{crypto_code}_{base_currency}"] = float(entry[base_lower])
+            except (KeyError, TypeError, ValueError):
+                # Нет курса к базовой валюте или он не число — пара пропускается
+                continue
+        return rates
 
 
 class ExchangeRateApiClient(BaseApiClient):
@@ -119,15 +185,50 @@ class ExchangeRateApiClient(BaseApiClient):
         if data.get("result") != "success":
             error_type = data.get("error-type", "unknown_error")
             raise ApiRequestError(f"ExchangeRate-API: {error_type} (неверный ключ или лимит запросов)")
+        conversion_rates = data.get("conversion_rates") or {}
+        if not isinstance(conversion_rates, dict):
+            raise ApiRequestError(
+                f"Ошибка парсинга ответа ExchangeRate-API: conversion_rates — ожидался объект, получено {type(conversion_rates).__name__}"
+            )
         try:
-            conversion_rates = data.get("conversion_rates") or {}
             rates: Dict[str, float] = {}
+            base_currency = self.config.BASE_CURRENCY
             for currency in self.config.FIAT_CURRENCIES:
-                if currency in conversion_rates:
-                    pair_key = f"{currency}_{self.config.BASE_CURRENCY}"
-                    rates[pair_key] = float(conversion_rates[currency])
+                value = conversion_rates.get(currency)
+                if value is None:
+                    continue
+                rates[f"{currency}_{base_currency}"] = float(value)
             return rates
         except (TypeError, ValueError) as e:
             raise ApiRequestError(f"Ошибка парсинга ответа ExchangeRate-API: {e}") from e
             
             
+
+
+class FetchResult(NamedTuple):
+    """Итог fetch_rates() одного клиента: курсы или исключение, время запроса в мс."""
+    rates: Optional[Dict[str, float]]
+    error: Optional[Exception]
+    request_ms: int
+
+
+def _timed_fetch(client: BaseApiClient) -> FetchResult:
+    t0 = time.perf_counter()
+    try:
+        rates = client.fetch_rates()
+    except Exception as e:
+        return FetchResult(None, e, int((time.perf_counter() - t0) * 1000))
+    return FetchResult(rates, None, int((time.perf_counter() - t0) * 1000))
+
+
+def fetch_rates_parallel(clients: Mapping[str, BaseApiClient]) -> Dict[str, FetchResult]:
+    """
+    Одновременный вызов fetch_rates() у нескольких клиентов (по потоку на клиента).
+    Запросы сетевые, поэтому общее время ≈ самому долгому ответу, а не сумме.
+    Исключения не пробрасываются — возвращаются в FetchResult.error; порядок ключей как в clients.
+    """
+    if len(clients) <= 1:
+        return {name: _timed_fetch(client) for name, client in clients.items()}
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        futures = {name: executor.submit(_timed_fetch, client) for name, client in clients.items()}
+        return {name: future.result() for name, future in futures.items()}
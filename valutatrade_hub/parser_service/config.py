@@ -4,25 +4,35 @@
 API-ключ: только из переменной окружения EXCHANGERATE_API_KEY или из локального файла
 (не отслеживаемого git), не хранить ключ в коде.
 """
+import functools
 import os
 from dataclasses import dataclass, field
 from typing import Dict, Tuple
 
+from ..logging_config import get_logger
 
+# Предупреждение о демо-ключе выводится не чаще одного раза за процесс
+_demo_key_warned = False
+
+
+@functools.lru_cache(maxsize=8)
 def _read_key_from_file(filepath: str, key_name: str) -> str:
     """
     Читает значение ключа из файла в формате KEY=value.
     Возвращает пустую строку, если ключ не найден или ошибка чтения.
+    Строки без имени ключа отбрасываются по байтам, без декодирования и strip;
+    результат кешируется на путь — файл ключа читается один раз за процесс.
     """
-    if not os.path.isfile(filepath):
-        return ""
+    prefix = f"{key_name}=".encode("utf-8")
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
+        with open(filepath, "rb") as f:
+            for raw in f:
+                if prefix not in raw:
+                    continue
+                line = raw.decode("utf-8").strip()
                 if line.startswith(f"{key_name}="):
                     return line.split("=", 1)[1].strip().strip('"\'')
-    except OSError:
+    except (OSError, UnicodeDecodeError):
         pass
     return ""
 
@@ -43,10 +53,10 @@ def _load_api_key_from_env_or_file() -> str:
     return ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ParserConfig:
     """
-    Структурированное хранение настроек парсера (dataclass).
+    Структурированное хранение настроек парсера (неизменяемый dataclass со __slots__).
     Чувствительные данные (API-ключ) загружаются из окружения или локального файла.
     """
     # API-ключ: не хранить в коде; из переменной окружения или не отслеживаемого git файла
@@ -85,11 +95,32 @@ class ParserConfig:
     UPDATE_INTERVAL_MINUTES: int = 5
     RATES_TTL_SECONDS: int = 300
 
+    # Запись rates.json и журнала с отступами (для отладки); по умолчанию компактно
+    PRETTY_JSON: bool = False
+
+    # Параметры запросов, вычисляемые один раз в __post_init__
+    _coingecko_params: Dict[str, str] = field(init=False, repr=False, compare=False)
+    _exchangerate_url: str = field(init=False, repr=False, compare=False)
+    _base_currency_lower: str = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
-        """Создание директории для данных при необходимости."""
+        """Создание директории для данных при необходимости; предвычисление параметров запросов."""
         dir_path = os.path.dirname(self.RATES_FILE_PATH)
         if dir_path:
             os.makedirs(dir_path, exist_ok=True)
+        object.__setattr__(self, '_base_currency_lower', self.BASE_CURRENCY.lower())
+        object.__setattr__(self, '_coingecko_params', {
+            'ids': ','.join(
+                self.CRYPTO_ID_MAP[currency]
+                for currency in self.CRYPTO_CURRENCIES
+                if currency in self.CRYPTO_ID_MAP
+            ),
+            'vs_currencies': self._base_currency_lower,
+        })
+        object.__setattr__(
+            self, '_exchangerate_url',
+            f'{self.EXCHANGERATE_API_URL}/{self.EXCHANGERATE_API_KEY}/latest/{self.BASE_CURRENCY}',
+        )
 
     @classmethod
     def from_env(cls) -> "ParserConfig":
@@ -99,22 +130,28 @@ class ParserConfig:
             REQUEST_TIMEOUT=int(os.getenv("PARSER_REQUEST_TIMEOUT", "10")),
             UPDATE_INTERVAL_MINUTES=int(os.getenv("PARSER_UPDATE_INTERVAL", "5")),
             RATES_TTL_SECONDS=int(os.getenv("RATES_TTL_SECONDS", "300")),
+            PRETTY_JSON=os.getenv("PARSER_PRETTY_JSON", "").lower() in ("1", "true", "yes"),
         )
     
     def _warn_if_demo_api_key(self) -> None:
-        """Выводит предупреждение, если используется демо-ключ ExchangeRate-API."""
+        """Предупреждение в лог (один раз за процесс), если используется демо-ключ ExchangeRate-API."""
+        global _demo_key_warned
+        if _demo_key_warned:
+            return
         if not self.EXCHANGERATE_API_KEY or self.EXCHANGERATE_API_KEY == 'demo_key':
-            print('   ВНИМАНИЕ: Используется демо-ключ ExchangeRate-API!')
-            print('   Для работы с фиатными валютами зарегистрируйтесь на:')
-            print('   https://app.exchangerate-api.com/sign-up')
-            print('   и установите переменную окружения EXCHANGERATE_API_KEY')
+            _demo_key_warned = True
+            get_logger('parser_service').warning(
+                'Используется демо-ключ ExchangeRate-API. Для работы с фиатными валютами '
+                'зарегистрируйтесь на https://app.exchangerate-api.com/sign-up '
+                'и установите переменную окружения EXCHANGERATE_API_KEY'
+            )
 
     def _validate_currency_codes(self) -> None:
         """Проверяет, что все коды валют в верхнем регистре и содержат только буквы."""
-        all_currencies = list(self.FIAT_CURRENCIES) + list(self.CRYPTO_CURRENCIES)
-        if not all(
-            currency.isalpha() and currency.isupper() for currency in all_currencies
-        ):
+        all_currencies = self.FIAT_CURRENCIES + self.CRYPTO_CURRENCIES
+        # Одна проверка isalpha/isupper по склеенной строке; all() отсекает пустые коды
+        joined = ''.join(all_currencies)
+        if not (all(all_currencies) and joined.isalpha() and joined.isupper()):
             raise ValueError(
                 'Ошибка: Коды валют должны быть в верхнем регистре и содержать только буквы'
             )
@@ -124,14 +161,16 @@ class ParserConfig:
         data_dir = os.path.dirname(self.RATES_FILE_PATH)
         if not data_dir:
             return
-        if not os.path.exists(data_dir):
-            try:
-                os.makedirs(data_dir, exist_ok=True)
-                print(f'Создана директория: {data_dir}')
-            except OSError as e:
-                raise ValueError(
-                    f'Ошибка: Не удалось создать директорию {data_dir}: {e}'
-                ) from e
+        # Без предварительной проверки exists(): существующий каталог — FileExistsError
+        try:
+            os.makedirs(data_dir)
+        except FileExistsError:
+            return
+        except OSError as e:
+            raise ValueError(
+                f'Ошибка: Не удалось создать директорию {data_dir}: {e}'
+            ) from e
+        print(f'Создана директория: {data_dir}')
 
     def validate(self) -> bool:
         """Валидация конфигурации: предупреждение о ключе, проверка валют, создание директории."""
@@ -142,21 +181,27 @@ class ParserConfig:
     
     def get_coingecko_params(self) -> Dict[str, str]:
         '''
-        Получение параметров для запроса к CoinGecko (без ключа)
+        Получение параметров для запроса к CoinGecko (без ключа); собраны в __post_init__
         '''
-        crypto_ids = ','.join(
-            self.CRYPTO_ID_MAP[currency] 
-            for currency in self.CRYPTO_CURRENCIES 
-            if currency in self.CRYPTO_ID_MAP
-        )
-        
-        return {
-            'ids': crypto_ids,
-            'vs_currencies': self.BASE_CURRENCY.lower()
-        }
+        return self._coingecko_params
     
     def get_exchangerate_url(self) -> str:
         '''
-        Получение URL для запроса к ExchangeRate-API (требует ключ)
+        Получение URL для запроса к ExchangeRate-API (требует ключ); собран в __post_init__
         '''
-        return f'{self.EXCHANGERATE_API_URL}/{self.EXCHANGERATE_API_KEY}/latest/{self.BASE_CURRENCY}'
+        return self._exchangerate_url
+
+    @property
+    def base_currency_lower(self) -> str:
+        '''Базовая валюта в нижнем регистре (ключ в ответе CoinGecko); вычислена в __post_init__'''
+        return self._base_currency_lower
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_config() -> ParserConfig:
+    """
+    Общая конфигурация по умолчанию (ParserConfig.from_env()), создаётся один раз за процесс.
+    Для перечитывания окружения и файла ключа — get_default_config.cache_clear()
+    и _read_key_from_file.cache_clear().
+    """
+    return ParserConfig.from_env()
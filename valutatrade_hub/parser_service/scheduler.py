@@ -1,10 +1,9 @@
 # valutatrade_hub/parser_service/scheduler.py
 import threading
-import time
 from typing import Optional
 
 from ..logging_config import get_logger
-from .config import ParserConfig
+from .config import ParserConfig, get_default_config
 from .updater import RatesUpdater
 
 
@@ -14,8 +13,8 @@ class Scheduler:
     '''
     
     def __init__(self, config: ParserConfig = None):
-        self.config = config or ParserConfig.from_env()
-        self.updater = RatesUpdater(config)
+        self.config = config or get_default_config()
+        self.updater = RatesUpdater(self.config)
         self.logger = get_logger('scheduler')
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
@@ -56,19 +55,12 @@ class Scheduler:
             try:
                 self.logger.debug('Running scheduled update...')
                 self.updater.run_update()
-                
-                wait_time = self.config.UPDATE_INTERVAL_MINUTES * 60
-                for _ in range(wait_time * 2):
-                    if self._stop_event.is_set():
-                        break
-                    time.sleep(0.5)
+                # Event.wait возвращается сразу после stop(), без опроса флага
+                self._stop_event.wait(self.config.UPDATE_INTERVAL_MINUTES * 60)
                 
             except Exception as e:
                 self.logger.error(f'Scheduler error: {e}')
-                for _ in range(60):
-                    if self._stop_event.is_set():
-                        break
-                    time.sleep(0.5)
+                self._stop_event.wait(30)
     
     def run_once(self):
         '''
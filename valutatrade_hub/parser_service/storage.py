@@ -4,9 +4,138 @@
 id = FROM_TO_ISO-UTC (уникальный идентификатор), запись атомарно (temp file → rename).
 """
 import json
+import mmap
 import os
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from ..infra.database import db
+
+try:
+    import orjson  # опционально: более быстрая сериализация JSON
+except ImportError:
+    orjson = None
+
+
+@dataclass(slots=True)
+class RateRecord:
+    """Запись журнала exchange_rates.json; в JSON — объект с теми же полями в том же порядке."""
+    id: str
+    from_currency: str
+    to_currency: str
+    rate: float
+    timestamp: str
+    source: str
+    meta: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "from_currency": self.from_currency,
+            "to_currency": self.to_currency,
+            "rate": self.rate,
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "meta": self.meta,
+        }
+
+
+def _record_id(record: Union[RateRecord, Dict[str, Any]]) -> Optional[str]:
+    """id записи журнала: RateRecord (новые записи) или dict (прочитанные из файла)."""
+    return record.id if isinstance(record, RateRecord) else record.get("id")
+
+
+def _json_default(obj: Any) -> Any:
+    """Сериализация нестандартных объектов для json: RateRecord — словарём, прочее — строкой."""
+    if isinstance(obj, RateRecord):
+        return obj.to_dict()
+    return str(obj)
+
+
+def serialize_json(data: Any, pretty: bool = False) -> bytes:
+    """
+    JSON в байтах: по умолчанию компактно (orjson, если установлен);
+    pretty=True — с отступом 2 для чтения глазами. RateRecord сериализуется как объект
+    (orjson — нативно, как dataclass).
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False, default=_json_default).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def ensure_directory(dir_path: str, ensured: Set[str]) -> None:
+    """os.makedirs один раз на каталог: уже проверенные каталоги запоминаются в ensured."""
+    if dir_path not in ensured:
+        os.makedirs(dir_path, exist_ok=True)
+        ensured.add(dir_path)
+
+
+def write_bytes_atomic(path_abs: str, payload: bytes, fsync: bool = False) -> None:
+    """
+    Атомарная запись: временный файл → os.replace.
+    fsync=True — один fsync временного файла перед replace (данные на диске до переименования).
+    """
+    temp_path = path_abs + ".tmp"
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(temp_path, path_abs)
+
+
+def read_json_file(path_abs: str) -> Any:
+    """
+    Чтение JSON-файла; None, если файла нет или JSON повреждён.
+    С orjson файл разбирается прямо из mmap — без промежуточной копии read() для больших журналов.
+    """
+    try:
+        with open(path_abs, "rb") as f:
+            if orjson is None:
+                return json.loads(f.read())
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+
+def drop_page_cache(path_abs: str) -> None:
+    """
+    Подсказка ядру (POSIX_FADV_DONTNEED), что страницы файла не понадобятся для повторного чтения.
+    Только там, где есть posix_fadvise (Linux); ошибки игнорируются — это лишь оптимизация.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path_abs, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path_abs: str, data: Any, pretty: bool = False, fsync: bool = False) -> None:
+    """Атомарная запись JSON (serialize_json + write_bytes_atomic)."""
+    write_bytes_atomic(path_abs, serialize_json(data, pretty), fsync)
+
+
+def format_utc_timestamp(timestamp_utc: datetime) -> str:
+    """ISO-время UTC с точностью до секунд и суффиксом Z: 2025-10-10T12:00:00Z (isoformat быстрее strftime)."""
+    return timestamp_utc.replace(tzinfo=None).isoformat(timespec="seconds") + "Z"
 
 
 def make_rate_id(from_currency: str, to_currency: str, timestamp_utc: datetime) -> str:
@@ -16,89 +145,118 @@ def make_rate_id(from_currency: str, to_currency: str, timestamp_utc: datetime)
     """
     from_c = (from_currency or "").upper()[:5]
     to_c = (to_currency or "").upper()[:5]
-    ts = timestamp_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
-    return f"{from_c}_{to_c}_{ts}"
+    return f"{from_c}_{to_c}_{format_utc_timestamp(timestamp_utc)}"
 
 
 def build_exchange_rate_record(
     from_currency: str,
     to_currency: str,
     rate: float,
-    timestamp_utc: datetime,
+    timestamp_utc: Union[datetime, str],
     source: str,
     meta: Dict[str, Any],
-) -> Dict[str, Any]:
+) -> RateRecord:
     """
-    Одна запись для журнала: пара, курс, время (UTC), источник, meta.
+    Одна запись для журнала (RateRecord): пара, курс, время (UTC), источник, meta.
     Коды валют нормализуются в верхний регистр (2–5 символов).
+    timestamp_utc — datetime или уже отформатированная строка (format_utc_timestamp),
+    чтобы при пакетной сборке записей время форматировалось один раз.
+    meta сохраняется в записи без копирования — вызывающий код не должен менять его после вызова.
     """
     from_c = (from_currency or "").upper()[:5]
     to_c = (to_currency or "").upper()[:5]
-    ts_str = timestamp_utc.strftime("%Y-%m-%dT%H:%M:%SZ")
+    ts_str = timestamp_utc if isinstance(timestamp_utc, str) else format_utc_timestamp(timestamp_utc)
     record_id = f"{from_c}_{to_c}_{ts_str}"
-    return {
-        "id": record_id,
-        "from_currency": from_c,
-        "to_currency": to_c,
-        "rate": float(rate),
-        "timestamp": ts_str,
-        "source": source,
-        "meta": dict(meta) if meta else {},
-    }
+    return RateRecord(record_id, from_c, to_c, float(rate), ts_str, source, meta or {})
 
 
 class ParserStorage:
     """
     Работа с хранилищем парсера: журнал exchange_rates.json (одна запись — одна пара),
     атомарная запись (временный файл → rename).
+    Содержимое журнала и индекс id держатся в памяти и перечитываются с диска,
+    только если файл изменился извне (другие mtime/размер).
     """
 
-    def append_exchange_rate_records(self, records: List[Dict[str, Any]], file_path: str) -> None:
+    def __init__(self, pretty: bool = False):
+        self.pretty = pretty
+        self._ensured_dirs: Set[str] = set()
+        # путь → ((mtime_ns, size), записи, множество id)
+        self._journal_cache: Dict[str, Tuple[Tuple[int, int], List[Union[RateRecord, Dict[str, Any]]], Set[str]]] = {}
+
+    def _load_journal(self, path_abs: str) -> Tuple[List[Union[RateRecord, Dict[str, Any]]], Set[str]]:
+        """Записи журнала и индекс их id: из памяти, если файл не менялся с последней записи/чтения."""
+        stamp = db.file_stamp(path_abs)
+        cached = self._journal_cache.get(path_abs)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            return cached[1], cached[2]
+
+        current = read_json_file(path_abs)
+        if current is None:
+            current = []
+        elif not isinstance(current, list):
+            current = [current] if current else []
+
+        existing_ids = set(filter(None, (r.get("id") for r in current)))
+        if stamp is not None:
+            self._journal_cache[path_abs] = (stamp, current, existing_ids)
+        return current, existing_ids
+
+    def append_exchange_rate_records(self, records: List[Union[RateRecord, Dict[str, Any]]], file_path: str) -> None:
         """
-        Добавляет записи в журнал без дубликатов по id.
+        Добавляет записи в журнал без дубликатов по id (проверка по индексу id в памяти).
         Запись выполняется атомарно: запись во временный файл → os.replace.
         """
         if not records:
             return
         path_abs = os.path.abspath(file_path)
         dir_path = os.path.dirname(path_abs)
-        os.makedirs(dir_path, exist_ok=True)
+        ensure_directory(dir_path, self._ensured_dirs)
 
-        try:
-            with open(path_abs, "r", encoding="utf-8") as f:
-                try:
-                    current = json.load(f)
-                except (json.JSONDecodeError, FileNotFoundError):
-                    current = []
-        except FileNotFoundError:
-            current = []
-
-        if not isinstance(current, list):
-            current = [current] if current else []
-
-        existing_ids = {r.get("id") for r in current if r.get("id")}
-        new_records = [r for r in records if r.get("id") and r["id"] not in existing_ids]
+        current, existing_ids = self._load_journal(path_abs)
+        new_records = [r for r in records if (rid := _record_id(r)) and rid not in existing_ids]
         if not new_records:
             return
 
-        result = current + new_records
-        temp_path = path_abs + ".tmp"
-        with open(temp_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False, default=str)
-        os.replace(temp_path, path_abs)
+        # Список журнала дополняется на месте, без копии; при ошибке записи — откат
+        old_len = len(current)
+        current.extend(new_records)
+        try:
+            # Журнал — единственная копия истории: один fsync на пакет записей за тик
+            write_json_atomic(path_abs, current, self.pretty, fsync=True)
+        except BaseException as e:
+            del current[old_len:]
+            if isinstance(e, FileNotFoundError):
+                # Каталог удалён извне — при следующей записи создадим заново
+                self._ensured_dirs.discard(dir_path)
+            raise
+        existing_ids.update(map(_record_id, new_records))
+
+        stamp = db.file_stamp(path_abs)
+        if stamp is not None:
+            self._journal_cache[path_abs] = (stamp, current, existing_ids)
 
     def get_historical_rates(self, currency_pair: str, limit: int = 100) -> List[Dict]:
-        """Исторические записи по паре валют (from_currency или to_currency)."""
-        from ..infra.database import db
-
-        history = db.load_data("exchange_rates") or []
+        """
+        Исторические записи по паре валют (from_currency или to_currency).
+        Журнал просматривается с конца до limit совпадений — последние записи без полного фильтра.
+        """
+        history = read_json_file(db.path_for("exchange_rates")) or []
         if not isinstance(history, list):
             history = [history] if history else []
         pair_upper = (currency_pair or "").upper()
-        filtered = [
-            r
-            for r in history
-            if (r.get("from_currency") or "").upper() == pair_upper
-            or (r.get("to_currency") or "").upper() == pair_upper
-        ]
-        return filtered[-limit:]
+
+        def matches(r: Dict[str, Any]) -> bool:
+            return ((r.get("from_currency") or "").upper() == pair_upper
+                    or (r.get("to_currency") or "").upper() == pair_upper)
+
+        if limit <= 0:
+            # Поведение среза [-limit:] для неположительных limit
+            return [r for r in history if matches(r)][-limit:]
+        found = deque(maxlen=limit)
+        for r in reversed(history):
+            if matches(r):
+                found.appendleft(r)
+                if len(found) == limit:
+                    break
+        return list(found)
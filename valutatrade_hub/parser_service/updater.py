@@ -4,32 +4,50 @@
 RatesUpdater — точка входа для логики парсинга; принимает экземпляры API-клиентов и хранилища.
 Итоговый JSON в формате Core Service: data/rates.json (pairs + last_refresh).
 """
-import time
+import json
+import os
+import re
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from valutatrade_hub.core.exceptions import ApiRequestError
 
+from ..infra.database import db
 from ..logging_config import get_logger
-from .storage import ParserStorage, build_exchange_rate_record
+from .api_clients import CoinGeckoClient, ExchangeRateApiClient, fetch_rates_parallel
+from .config import get_default_config
+from .storage import (
+    ParserStorage,
+    RateRecord,
+    build_exchange_rate_record,
+    drop_page_cache,
+    ensure_directory,
+    format_utc_timestamp,
+    serialize_json,
+    write_bytes_atomic,
+)
 
-SOURCE_DISPLAY_NAMES = {"coingecko": "CoinGecko", "exchangerate": "ExchangeRate-API"}
+SOURCE_DISPLAY_NAMES = MappingProxyType({"coingecko": "CoinGecko", "exchangerate": "ExchangeRate-API"})
 
 
-def _validate_pair_and_rate(pair_key: str, rate: Any) -> bool:
-    """Коды валют — верхний регистр, 2–5 символов; rate — число. Пишем только после валидации."""
-    if "_" not in pair_key or pair_key.count("_") != 1:
-        return False
-    from_c, to_c = pair_key.split("_", 1)
-    if not (2 <= len(from_c) <= 5 and from_c.isalpha() and from_c.isupper()):
-        return False
-    if not (2 <= len(to_c) <= 5 and to_c.isalpha() and to_c.isupper()):
-        return False
+# Пара валют: FROM_TO, коды — латиница в верхнем регистре, 2–5 символов
+_PAIR_RE = re.compile(r"([A-Z]{2,5})_([A-Z]{2,5})")
+
+
+def _parse_pair_and_rate(pair_key: str, rate: Any) -> Optional[Tuple[str, str]]:
+    """
+    Коды валют — верхний регистр, 2–5 символов; rate — число. Пишем только после валидации.
+    Возвращает (from, to) для корректной пары, иначе None.
+    """
+    m = _PAIR_RE.fullmatch(pair_key)
+    if m is None:
+        return None
     try:
         float(rate)
     except (TypeError, ValueError):
-        return False
-    return True
+        return None
+    return m.group(1), m.group(2)
 
 
 class RatesUpdater:
@@ -40,13 +58,14 @@ class RatesUpdater:
     """
     
     def __init__(self, config=None, clients=None, storage=None):
-        from .api_clients import CoinGeckoClient, ExchangeRateApiClient
-        from .config import ParserConfig
-        
-        self.config = config or ParserConfig.from_env()
+        self.config = config or get_default_config()
         self.config.validate()
         self.logger = get_logger("parser_service")
-        self.storage = storage if storage is not None else ParserStorage()
+        self.storage = storage if storage is not None else ParserStorage(pretty=self.config.PRETTY_JSON)
+        # Снимок pairs из rates.json и отметка файла (mtime_ns, size), которой он соответствует
+        self._pairs_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pairs_stamp: Optional[Tuple[int, int]] = None
+        self._ensured_dirs: Set[str] = set()
         if clients is not None:
             self.clients = clients
         else:
@@ -57,10 +76,11 @@ class RatesUpdater:
     
     def run_update(self, source: str = None) -> Tuple[Dict[str, float], List[str]]:
         """
-        1. Вызывает fetch_rates() у каждого клиента.
+        1. Вызывает fetch_rates() у каждого клиента (параллельно, см. fetch_rates_parallel).
         2. Объединяет полученные словари с курсами в один.
         3. Добавляет метаданные: source, last_refresh.
-        4. Передаёт итоговый объект в storage для сохранения (exchange_rates + rates.json).
+        4. Передаёт итоговый объект в storage для сохранения: журнал exchange_rates — одной записью
+           на всё обновление, затем rates.json.
         5. Подробное логирование: старт, успех/неудача по каждому клиенту, завершение.
         Возвращает (all_rates, failed_sources) для интеграции с CLI.
         """
@@ -68,43 +88,56 @@ class RatesUpdater:
         all_rates: Dict[str, float] = {}
         pair_sources: Dict[str, str] = {}
         failed_sources: List[str] = []
+        journal_records: List[RateRecord] = []
         sources_to_update = [source] if source else list(self.clients.keys())
         
+        clients_to_poll = {}
         for source_name in sources_to_update:
             if source_name not in self.clients:
                 self.logger.warning("run_update: неизвестный источник %s, пропуск", source_name)
                 continue
+            self.logger.info("run_update: опрос клиента %s", source_name)
+            clients_to_poll[source_name] = self.clients[source_name]
+        
+        # Сетевые запросы к источникам идут параллельно; разбор ответов — последовательно, в исходном порядке
+        fetched = fetch_rates_parallel(clients_to_poll)
+        # Одна отметка времени на всё обновление — строка форматируется один раз, а не на каждую запись
+        timestamp_str = format_utc_timestamp(datetime.now(timezone.utc))
+        
+        for source_name, (rates, error, request_ms) in fetched.items():
             try:
-                self.logger.info("run_update: опрос клиента %s", source_name)
-                t0 = time.perf_counter()
-                rates = self.clients[source_name].fetch_rates()
-                request_ms = int((time.perf_counter() - t0) * 1000)
+                if error is not None:
+                    raise error
                 
                 if not rates:
                     self.logger.warning("run_update: клиент %s вернул пустой результат", source_name)
                     continue
                 
                 display_name = SOURCE_DISPLAY_NAMES.get(source_name, source_name)
-                timestamp_utc = datetime.now(timezone.utc)
-                records: List[Dict[str, Any]] = []
+                # raw_id (id монеты CoinGecko) добавляется только для coingecko — решается один раз на источник
+                crypto_id_map = getattr(self.config, "CRYPTO_ID_MAP", None) if source_name == "coingecko" else None
+                # Общий meta для записей источника без raw_id (build_exchange_rate_record его не копирует)
+                shared_meta = {"request_ms": request_ms}
+                records: List[RateRecord] = []
                 
                 for pair_key, rate in rates.items():
-                    if not _validate_pair_and_rate(pair_key, rate):
+                    pair = _parse_pair_and_rate(pair_key, rate)
+                    if pair is None:
                         self.logger.warning("run_update: пропуск пары/курса %r = %r", pair_key, rate)
                         continue
-                    from_c, to_c = pair_key.split("_", 1)
-                    from_c, to_c = from_c.upper(), to_c.upper()
-                    meta = {"request_ms": request_ms}
-                    if source_name == "coingecko" and getattr(self.config, "CRYPTO_ID_MAP", None):
-                        meta["raw_id"] = self.config.CRYPTO_ID_MAP.get(from_c, "")
+                    from_c, to_c = pair
+                    if crypto_id_map:
+                        meta = {"request_ms": request_ms, "raw_id": crypto_id_map.get(from_c, "")}
+                    else:
+                        meta = shared_meta
                     record = build_exchange_rate_record(
-                        from_c, to_c, float(rate), timestamp_utc, display_name, meta
+                        from_c, to_c, float(rate), timestamp_str, display_name, meta
                     )
                     records.append(record)
                 
                 if records:
-                    self.storage.append_exchange_rate_records(records, self.config.HISTORY_FILE_PATH)
-                    self.logger.info("run_update: успех %s — записей в журнал: %s", source_name, len(records))
+                    journal_records.extend(records)
+                    self.logger.info("run_update: успех %s — записей для журнала: %s", source_name, len(records))
                 
                 for pair_key in rates:
                     pair_sources[pair_key] = display_name
@@ -118,6 +151,14 @@ class RatesUpdater:
                 self.logger.error("run_update: неожиданная ошибка от %s — %s", source_name, e)
                 failed_sources.append(source_name)
         
+        # Журнал пишется один раз за обновление — записи всех источников одним пакетом
+        if journal_records:
+            try:
+                self.storage.append_exchange_rate_records(journal_records, self.config.HISTORY_FILE_PATH)
+                self.logger.info("run_update: в журнал записано: %s", len(journal_records))
+            except Exception as e:
+                self.logger.error("run_update: ошибка записи журнала — %s", e)
+        
         if all_rates:
             self._save_rates_cache(all_rates, pair_sources)
             self.logger.info("run_update: завершение — всего курсов: %s, сохранено в data/rates.json", len(all_rates))
@@ -125,39 +166,51 @@ class RatesUpdater:
             self.logger.warning("run_update: завершение — ни один клиент не вернул курсов")
         return (all_rates, failed_sources)
     
+    def _load_pairs(self, path_abs: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Текущие pairs из rates.json: из памяти, если файл не менялся после нашей последней записи;
+        иначе — чтение с диска (с конвертацией legacy-формата rates + timestamp).
+        """
+        stamp = db.file_stamp(path_abs)
+        if self._pairs_cache is not None and stamp is not None and stamp == self._pairs_stamp:
+            return self._pairs_cache
+
+        try:
+            with open(path_abs, 'r', encoding='utf-8') as f:
+                current = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            current = {}
+
+        pairs = current.get('pairs')
+        if pairs is None:
+            # Текущий формат (pairs) — обычный случай; legacy (rates + timestamp) разбирается только без pairs
+            legacy_rates = current.get('rates')
+            if legacy_rates is not None:
+                legacy_ts = current.get('timestamp') or ''
+                legacy_src = current.get('source', 'unknown')
+                pairs = {
+                    pair: {'rate': v, 'updated_at': legacy_ts, 'source': legacy_src}
+                    for pair, v in legacy_rates.items()
+                }
+            else:
+                pairs = {}
+        self._pairs_cache = pairs
+        self._pairs_stamp = stamp
+        return pairs
+
     def _save_rates_cache(self, rates: Dict[str, float], pair_sources: Dict[str, str]):
         '''
         Снимок текущего мира: pairs = { pair: { rate, updated_at, source } }, last_refresh.
         Апдейт побеждает, если updated_at свежее текущего. Атомарная запись: temp file → rename.
+        pairs держатся в памяти между вызовами — rates.json перечитывается, только если изменён извне.
         '''
         try:
-            import json
-            import os
-            
             path_abs = os.path.abspath(self.config.RATES_FILE_PATH)
-            dir_path = os.path.dirname(path_abs)
-            os.makedirs(dir_path, exist_ok=True)
-            
-            # Читаем текущий кеш (или legacy format)
-            try:
-                with open(path_abs, 'r', encoding='utf-8') as f:
-                    current = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                current = {}
+            ensure_directory(os.path.dirname(path_abs), self._ensured_dirs)
             
-            pairs = current.get('pairs')
-            if pairs is None and current.get('rates') is not None:
-                # Legacy: rates + timestamp
-                legacy_ts = current.get('timestamp') or ''
-                legacy_src = current.get('source', 'unknown')
-                pairs = {
-                    pair: {'rate': v, 'updated_at': legacy_ts, 'source': legacy_src}
-                    for pair, v in current.get('rates', {}).items()
-                }
-            if pairs is None:
-                pairs = {}
+            pairs = self._load_pairs(path_abs)
             
-            now_ts = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+            now_ts = format_utc_timestamp(datetime.now(timezone.utc))
             for pair_key, rate in rates.items():
                 existing = pairs.get(pair_key, {})
                 existing_ts = existing.get('updated_at') or ''
@@ -169,13 +222,18 @@ class RatesUpdater:
                     }
             
             data_to_save = {'pairs': pairs, 'last_refresh': now_ts}
-            temp_path = path_abs + '.tmp'
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, indent=2, ensure_ascii=False)
-            os.replace(temp_path, path_abs)
+            payload = serialize_json(data_to_save, self.config.PRETTY_JSON)
+            # Без fsync: rates.json — воспроизводимый кэш, при потере восстанавливается следующим обновлением
+            write_bytes_atomic(path_abs, payload)
+            # rates.json перезаписывается каждый тик — старые страницы в page cache планировщику не нужны
+            drop_page_cache(path_abs)
+            self._pairs_stamp = db.file_stamp(path_abs)
             self.logger.info(f'Данные сохранены в {self.config.RATES_FILE_PATH}')
             
         except Exception as e:
+            # Снимок в памяти мог разойтись с файлом — при следующем сохранении перечитаем
+            self._pairs_cache = None
+            self._ensured_dirs.clear()
             self.logger.error(f'Error saving rates cache: {e}')
     
     def get_update_status(self) -> Dict[str, Any]:
@@ -183,9 +241,6 @@ class RatesUpdater:
         Получение статуса последнего обновления
         '''
         try:
-            import json
-            import os
-            
             if os.path.exists(self.config.RATES_FILE_PATH):
                 with open(self.config.RATES_FILE_PATH, 'r', encoding='utf-8') as f:
                     rates_data = json.load(f)